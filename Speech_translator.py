@@ -1,11 +1,19 @@
 import os
+import re
+import mmap
+import time
 import logging
 import requests
 from urllib.parse import urlparse
-from transformers import MBartForConditionalGeneration, MBart50TokenizerFast
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
-import torch
 import json
+import threading
+import itertools
+from translation_cache import cached_translation, lookup_translation, store_translation
+from phrase_table import get_phrase_table
+from circuit_breaker import get_circuit_breaker
 
 logger = logging.getLogger(__name__)
 
@@ -20,18 +28,139 @@ logger = logging.getLogger(__name__)
 _mbart_model = None
 _mbart_tokenizer = None
 
+# Loading/warm-up state: the lock prevents concurrent loads and the event is
+# set once the model is loaded (and warmed up, when warm-up was started)
+_mbart_load_lock = threading.Lock()
+_mbart_ready = threading.Event()
+_mbart_warmup_thread = None
+# Guards starting the warm-up thread only; never held during the load itself
+_mbart_warmup_start_lock = threading.Lock()
+
+# Language pairs translated during warm-up, e.g. "en_XX:fr_XX,en_XX:es_XX"
+MBART_WARMUP_PAIRS = [
+    tuple(pair.split(":"))
+    for pair in os.getenv("MBART_WARMUP_PAIRS", "en_XX:fr_XX,en_XX:es_XX").split(",")
+    if ":" in pair
+]
+MBART_WARMUP_ON_STARTUP = os.getenv("MBART_WARMUP_ON_STARTUP", "1") == "1"
+
 # Local model path - UPDATE THIS PATH TO YOUR LOCAL MODEL DIRECTORY
 LOCAL_MBART_PATH = "C:\\Users\\USER\\Downloads\\Audio-Audio-translator\\Facebook model"
 
+# Opt-in int8 dynamic quantization for CPU inference (MBART_QUANTIZE=1)
+MBART_QUANTIZE = os.getenv("MBART_QUANTIZE", "0") == "1"
+QUANTIZED_MBART_PATH = os.getenv(
+    "QUANTIZED_MBART_PATH",
+    os.path.join(LOCAL_MBART_PATH, "mbart_int8_dynamic.pt")
+)
+
+# Memory-mapped safetensors copy of the checkpoint (see convert_mbart_to_safetensors).
+# MBART_LOAD_FORMAT: "auto" uses it when present, "safetensors" requires it,
+# "pytorch" always deserializes the original checkpoint.
+SAFETENSORS_MBART_PATH = os.getenv("SAFETENSORS_MBART_PATH", os.path.join(LOCAL_MBART_PATH, "safetensors"))
+MBART_LOAD_FORMAT = os.getenv("MBART_LOAD_FORMAT", "auto").lower()
+
+# Inference engine for MBART: "torch" (PyTorch eager) or "onnx" (ONNX Runtime)
+MBART_BACKEND = os.getenv("MBART_BACKEND", "torch").lower()
+
+# Checkpoint with a target-language pruned vocabulary (see prune_mbart_vocab.py);
+# when set, it is loaded instead of the full model together with its id-remapping tokenizer
+PRUNED_MBART_PATH = os.getenv("PRUNED_MBART_PATH", "")
+
 # Spitch API configuration
 SPITCH_API_KEY = os.getenv("SPITCH_API_KEY", "sk_hQD6CYG6pOypyPIunknn7Bg4DcDRvAYvW71hjBLJ")
-SPITCH_BASE_URL = "https://api.spi-tch.com/v1"
+SPITCH_BASE_URL = os.getenv("SPITCH_BASE_URL", "https://api.spi-tch.com/v1")
+
+# Shared HTTP session for Spitch: keep-alive pool size, (connect, read)
+# timeouts in seconds, and retries with jittered exponential backoff on 429/5xx
+SPITCH_HTTP_POOL_SIZE = int(os.getenv("SPITCH_HTTP_POOL_SIZE", "10"))
+SPITCH_CONNECT_TIMEOUT = float(os.getenv("SPITCH_CONNECT_TIMEOUT", "3.05"))
+SPITCH_READ_TIMEOUT = float(os.getenv("SPITCH_READ_TIMEOUT", "30"))
+SPITCH_HTTP_RETRIES = int(os.getenv("SPITCH_HTTP_RETRIES", "3"))
+SPITCH_BACKOFF_FACTOR = float(os.getenv("SPITCH_BACKOFF_FACTOR", "0.5"))
+SPITCH_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_spitch_session = None
+_spitch_session_lock = threading.Lock()
+
+# test_connection results are reused for this many seconds per host
+CONNECTION_TEST_TTL = float(os.getenv("CONNECTION_TEST_TTL", "30"))
+_connection_status = {}
+
+# Input limits: the encoder truncates at MBART_MAX_INPUT_TOKENS, so longer
+# texts are split into sentence chunks of at most MBART_CHUNK_TOKENS tokens
+MBART_MAX_INPUT_TOKENS = 512
+MBART_CHUNK_TOKENS = int(os.getenv("MBART_CHUNK_TOKENS", "128"))
+
+# Named MBART decoding profiles (part of the translation cache key).
+# "realtime" is greedy with an output cap proportional to the input length,
+# "balanced" matches the original settings and "quality" uses wider beams.
+MBART_DECODING_PROFILES = {
+    'realtime': {
+        'num_beams': 1,
+        'max_length': 200,
+        'length_ratio': 1.5,
+        'length_offset': 10
+    },
+    'balanced': {
+        'num_beams': 4,
+        'max_length': 200,
+        'early_stopping': True
+    },
+    'quality': {
+        'num_beams': 8,
+        'max_length': 256,
+        'early_stopping': True
+    }
+}
+# Default profile: a name from MBART_DECODING_PROFILES, or "auto" to pick one
+# from the caller's latency budget ("balanced" when there is no budget)
+MBART_DEFAULT_PROFILE = os.getenv("MBART_DECODING_PROFILE", "balanced").lower()
+MBART_AUTO_FALLBACK_PROFILE = 'balanced'
+if MBART_DEFAULT_PROFILE != "auto" and MBART_DEFAULT_PROFILE not in MBART_DECODING_PROFILES:
+    raise ValueError(
+        f"Invalid MBART_DECODING_PROFILE '{MBART_DEFAULT_PROFILE}': "
+        f"use 'auto' or one of {', '.join(MBART_DECODING_PROFILES)}"
+    )
+
+# Initial decode speed estimates (steps/sec) for "auto" profile selection,
+# replaced by a moving average of live measurements as translations run
+MBART_THROUGHPUT_PRIORS = {'realtime': 40.0, 'balanced': 15.0, 'quality': 8.0}
+_profile_throughput = dict(MBART_THROUGHPUT_PRIORS)
+_throughput_lock = threading.Lock()
+
+def load_mbart_model(quantized=None):
+    """
+    Load MBART model and tokenizer from local path (cached)
+
+    Safe to call from several threads: only one load ever runs, and callers
+    arriving while a background warm-up is in progress wait for it instead.
 
-def load_mbart_model():
-    """Load MBART model and tokenizer from local path (cached)"""
-    global _mbart_model, _mbart_tokenizer
+    Args:
+        quantized (bool): Use the int8 dynamic-quantized model. Defaults to
+            the MBART_QUANTIZE setting; only applies to the first load.
+    """
+    if _mbart_model is not None and _mbart_tokenizer is not None:
+        return _mbart_model, _mbart_tokenizer
+
+    warmup = _mbart_warmup_thread
+    if warmup is not None and warmup is not threading.current_thread() and not _mbart_ready.is_set():
+        logger.info("Waiting for MBART warm-up to finish")
+        _mbart_ready.wait()
+
+    with _mbart_load_lock:
+        return _load_mbart_model_locked(quantized)
+
+def _load_mbart_model_locked(quantized=None):
+    """Load the model and tokenizer; caller must hold _mbart_load_lock"""
+    global _mbart_model, _mbart_tokenizer, MBART_QUANTIZE
     
     if _mbart_model is None or _mbart_tokenizer is None:
+        # Imported here so fallback/Spitch-only runs never pay for torch/transformers
+        from transformers import MBartForConditionalGeneration, MBart50TokenizerFast
+
+        if quantized is not None:
+            MBART_QUANTIZE = quantized
         try:
             logger.info(f"Loading MBART model and tokenizer from local path: {LOCAL_MBART_PATH}")
             
@@ -40,22 +169,274 @@ def load_mbart_model():
                 raise FileNotFoundError(f"Local model path does not exist: {LOCAL_MBART_PATH}")
             
             # Load model and tokenizer from local path
-            _mbart_model = MBartForConditionalGeneration.from_pretrained(
-                LOCAL_MBART_PATH,
-                local_files_only=True
-            )
-            _mbart_tokenizer = MBart50TokenizerFast.from_pretrained(
-                LOCAL_MBART_PATH,
-                local_files_only=True
-            )
+            if PRUNED_MBART_PATH:
+                from prune_mbart_vocab import load_pruned_mbart
+                model, _mbart_tokenizer = load_pruned_mbart(PRUNED_MBART_PATH)
+                _mbart_model = _quantize_mbart_model(model) if MBART_QUANTIZE else model
+            elif MBART_BACKEND == "onnx":
+                from mbart_onnx import load_onnx_mbart_model
+                _mbart_model = load_onnx_mbart_model()
+            elif MBART_QUANTIZE:
+                _mbart_model = _load_quantized_mbart_model()
+            elif MBART_LOAD_FORMAT == "safetensors" or (
+                MBART_LOAD_FORMAT == "auto" and os.path.exists(os.path.join(SAFETENSORS_MBART_PATH, "model.safetensors"))
+            ):
+                _mbart_model = _load_mmap_safetensors_model(SAFETENSORS_MBART_PATH)
+            else:
+                _mbart_model = MBartForConditionalGeneration.from_pretrained(
+                    LOCAL_MBART_PATH,
+                    local_files_only=True
+                )
+            if _mbart_tokenizer is None:
+                _mbart_tokenizer = MBart50TokenizerFast.from_pretrained(
+                    LOCAL_MBART_PATH,
+                    local_files_only=True
+                )
             logger.info("MBART model loaded successfully from local path")
+            if _mbart_warmup_thread is None:
+                _mbart_ready.set()
         except Exception as e:
             logger.error(f"Failed to load MBART model from local path: {e}")
             raise
     
     return _mbart_model, _mbart_tokenizer
 
-def translate_text_with_mbart(text, source_lang, target_lang):
+def convert_mbart_to_safetensors(output_dir=SAFETENSORS_MBART_PATH):
+    """
+    Save a safetensors copy of the local checkpoint for memory-mapped loading
+
+    Only needs to run once per host; afterwards load_mbart_model maps the
+    file instead of deserializing it, so processes share page-cache pages.
+
+    Returns:
+        str: The output directory
+    """
+    from transformers import MBartForConditionalGeneration
+
+    logger.info(f"Converting MBART checkpoint to safetensors: {output_dir}")
+    model = MBartForConditionalGeneration.from_pretrained(LOCAL_MBART_PATH, local_files_only=True)
+    model.save_pretrained(output_dir, safe_serialization=True)
+    logger.info("MBART safetensors conversion complete")
+    return output_dir
+
+# safetensors dtype names
+_SAFETENSORS_DTYPES = {
+    'F64': 'float64', 'F32': 'float32', 'F16': 'float16', 'BF16': 'bfloat16',
+    'I64': 'int64', 'I32': 'int32', 'I16': 'int16', 'I8': 'int8',
+    'U8': 'uint8', 'BOOL': 'bool'
+}
+
+def _mmap_safetensors(path):
+    """Return a state dict whose tensors point straight into a private mmap of ``path``"""
+    import torch
+
+    with open(path, "rb") as f:
+        header_size = int.from_bytes(f.read(8), "little")
+        header = json.loads(f.read(header_size))
+        # ACCESS_COPY: pages stay shared with the page cache until written
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    data_start = 8 + header_size
+    state_dict = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        dtype = getattr(torch, _SAFETENSORS_DTYPES[info["dtype"]])
+        begin, end = info["data_offsets"]
+        shape = info["shape"]
+        count = (end - begin) // torch.tensor([], dtype=dtype).element_size()
+        if count == 0:
+            state_dict[name] = torch.empty(shape, dtype=dtype)
+        else:
+            state_dict[name] = torch.frombuffer(mapped, dtype=dtype, count=count, offset=data_start + begin).view(shape)
+    return state_dict
+
+def _load_mmap_safetensors_model(model_dir):
+    """Build MBART without allocating weights and attach memory-mapped tensors"""
+    import torch
+    from transformers import MBartForConditionalGeneration, MBartConfig
+
+    logger.info(f"Memory-mapping MBART safetensors checkpoint: {model_dir}")
+    config = MBartConfig.from_pretrained(model_dir, local_files_only=True)
+    with torch.device("meta"):
+        model = MBartForConditionalGeneration(config)
+
+    state_dict = _mmap_safetensors(os.path.join(model_dir, "model.safetensors"))
+    model.load_state_dict(state_dict, strict=False, assign=True)
+    # Shared embeddings are stored once; re-tie the encoder/decoder/LM head copies
+    model.tie_weights()
+
+    missing = [name for name, tensor in itertools.chain(model.named_parameters(), model.named_buffers()) if tensor.is_meta]
+    if missing:
+        raise Exception(f"safetensors checkpoint is missing weights: {', '.join(missing[:5])}")
+
+    model.eval()
+    return model
+
+def _quantize_mbart_model(model):
+    """Apply int8 dynamic quantization to the model's Linear layers"""
+    import torch
+
+    model.eval()
+    # In place: a copy would hold fp32 and int8 weights at once, above fp32 alone
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+def _load_quantized_mbart_model():
+    """Load the int8 MBART model, quantizing and caching it on first use"""
+    import torch
+    from transformers import MBartForConditionalGeneration, MBartConfig
+
+    if os.path.exists(QUANTIZED_MBART_PATH):
+        logger.info(f"Loading cached int8 MBART checkpoint: {QUANTIZED_MBART_PATH}")
+        config = MBartConfig.from_pretrained(LOCAL_MBART_PATH, local_files_only=True)
+        try:
+            from transformers.modeling_utils import no_init_weights
+        except ImportError:
+            from contextlib import nullcontext as no_init_weights
+        # Only the module structure is needed: the checkpoint overwrites every weight
+        with no_init_weights():
+            model = MBartForConditionalGeneration(config)
+        model = _quantize_mbart_model(model)
+        model.load_state_dict(torch.load(QUANTIZED_MBART_PATH, weights_only=False))
+        return model
+
+    logger.info("Quantizing MBART Linear layers to int8 (first run)")
+    model = MBartForConditionalGeneration.from_pretrained(
+        LOCAL_MBART_PATH,
+        local_files_only=True
+    )
+    model = _quantize_mbart_model(model)
+
+    try:
+        torch.save(model.state_dict(), QUANTIZED_MBART_PATH)
+        logger.info(f"Saved int8 MBART checkpoint to {QUANTIZED_MBART_PATH}")
+    except Exception as e:
+        logger.warning(f"Could not cache int8 MBART checkpoint: {e}")
+
+    return model
+
+def _run_mbart_warmup(language_pairs):
+    """Load the model, then run dummy translations to warm up allocators and kernels"""
+    try:
+        started = time.perf_counter()
+        model, tokenizer = load_mbart_model()
+        logger.info(f"MBART loaded in {time.perf_counter() - started:.1f}s, warming up {len(language_pairs)} pairs")
+
+        for source_lang, target_lang in language_pairs:
+            for profile in {_resolve_profile(None), 'realtime'}:
+                try:
+                    _mbart_generate(model, tokenizer, ["Hello, how are you today?"], source_lang, target_lang, profile)
+                except Exception as e:
+                    logger.warning(f"MBART warm-up failed for {source_lang} -> {target_lang}: {e}")
+
+        logger.info(f"MBART warm-up complete in {time.perf_counter() - started:.1f}s")
+    except Exception as e:
+        logger.error(f"MBART warm-up failed: {e}")
+    finally:
+        # Always release waiting callers; if loading failed they retry and see the error
+        _mbart_ready.set()
+
+def start_mbart_warmup(language_pairs=None):
+    """
+    Load and warm up MBART on a background thread (idempotent)
+
+    Args:
+        language_pairs (list): (source, target) code pairs to translate a
+            dummy sentence for. Defaults to MBART_WARMUP_PAIRS.
+
+    Returns:
+        threading.Thread: The warm-up thread
+    """
+    global _mbart_warmup_thread
+
+    # Called on every Streamlit rerun: return without touching the load lock,
+    # which the warm-up thread holds for the whole model load
+    if _mbart_warmup_thread is not None:
+        return _mbart_warmup_thread
+
+    with _mbart_warmup_start_lock:
+        if _mbart_warmup_thread is None:
+            _mbart_warmup_thread = threading.Thread(
+                target=_run_mbart_warmup,
+                args=(list(language_pairs or MBART_WARMUP_PAIRS),),
+                name="mbart-warmup",
+                daemon=True
+            )
+            _mbart_warmup_thread.start()
+            logger.info("MBART warm-up started in background")
+    return _mbart_warmup_thread
+
+def is_mbart_ready():
+    """Return True once the MBART model is loaded (and warmed up, if started)"""
+    return _mbart_ready.is_set()
+
+def wait_for_mbart_ready(timeout=None):
+    """Block until MBART is ready; returns False if ``timeout`` expires first"""
+    return _mbart_ready.wait(timeout)
+
+def _mbart_backend_name():
+    """Backend name used in translation cache keys for the active MBART variant"""
+    if PRUNED_MBART_PATH:
+        return "mbart-pruned-int8" if MBART_QUANTIZE else "mbart-pruned"
+    if MBART_BACKEND == "onnx":
+        return "mbart-onnx"
+    return "mbart-int8" if MBART_QUANTIZE else "mbart"
+
+def get_decoding_throughput():
+    """Return the current decode speed estimate (steps/sec) for each profile"""
+    with _throughput_lock:
+        return dict(_profile_throughput)
+
+def _record_throughput(profile, steps, elapsed):
+    """Fold a measured decode speed into the profile's moving average"""
+    if steps <= 0 or elapsed <= 0:
+        return
+    with _throughput_lock:
+        _profile_throughput[profile] = 0.7 * _profile_throughput[profile] + 0.3 * (steps / elapsed)
+
+def select_decoding_profile(input_tokens, latency_budget):
+    """
+    Pick the widest decoding profile expected to finish within the budget
+
+    Args:
+        input_tokens (int): Approximate number of input tokens
+        latency_budget (float): Time allowed for decoding, in seconds
+
+    Returns:
+        str: Profile name ('quality', 'balanced' or 'realtime')
+    """
+    expected_steps = int(input_tokens * 1.2) + 5
+    throughput = get_decoding_throughput()
+    for profile in ('quality', 'balanced'):
+        if expected_steps / throughput[profile] <= latency_budget:
+            return profile
+    return 'realtime'
+
+def _resolve_profile(profile, texts=(), latency_budget=None):
+    """Return a concrete profile name, resolving "auto" from the latency budget"""
+    profile = profile or MBART_DEFAULT_PROFILE
+    if profile == "auto":
+        if latency_budget is None:
+            return MBART_AUTO_FALLBACK_PROFILE
+        # Rough token estimate; avoids loading the tokenizer before the cache lookup
+        input_tokens = max((int(len(text.split()) * 1.5) + 2 for text in texts), default=0)
+        chosen = select_decoding_profile(input_tokens, latency_budget)
+        logger.info(f"Auto decoding profile for {latency_budget:.2f}s budget: {chosen}")
+        return chosen
+    if profile not in MBART_DECODING_PROFILES:
+        raise ValueError(f"Unknown decoding profile: {profile}")
+    return profile
+
+def _generate_kwargs(profile, input_length):
+    """Turn a decoding profile into ``model.generate`` keyword arguments"""
+    kwargs = dict(MBART_DECODING_PROFILES[profile])
+    length_ratio = kwargs.pop('length_ratio', None)
+    length_offset = kwargs.pop('length_offset', 0)
+    if length_ratio is not None:
+        kwargs['max_length'] = min(kwargs['max_length'], int(input_length * length_ratio) + length_offset)
+    return kwargs
+
+def translate_text_with_mbart(text, source_lang, target_lang, profile=None, latency_budget=None):
     """
     Translate text using local MBART model
     
@@ -63,10 +444,22 @@ def translate_text_with_mbart(text, source_lang, target_lang):
         text (str): Text to translate
         source_lang (str): Source language code (e.g., 'en_XX')
         target_lang (str): Target language code (e.g., 'es_XX')
+        profile (str): Decoding profile ('realtime', 'balanced', 'quality'
+            or 'auto'). Defaults to MBART_DEFAULT_PROFILE.
+        latency_budget (float): Seconds allowed for decoding, used by 'auto'
     
     Returns:
         str: Translated text
     """
+    profile = _resolve_profile(profile, [text or ""], latency_budget)
+    return cached_translation(
+        text, source_lang, target_lang, _mbart_backend_name(),
+        lambda: _translate_text_with_mbart(text, source_lang, target_lang, profile),
+        params=MBART_DECODING_PROFILES[profile]
+    )
+
+def _translate_text_with_mbart(text, source_lang, target_lang, profile=None):
+    """Run the MBART model for a single text (uncached)"""
     try:
         if not text or not text.strip():
             raise ValueError("Input text is empty")
@@ -82,61 +475,593 @@ def translate_text_with_mbart(text, source_lang, target_lang):
         if target_lang not in tokenizer.lang_code_to_id:
             raise ValueError(f"Unsupported target language: {target_lang}")
         
-        # Set source language
-        tokenizer.src_lang = source_lang
+        # Long inputs would be truncated: translate them sentence by sentence
+        token_count = len(tokenizer(text, add_special_tokens=False)["input_ids"])
+        if token_count > MBART_CHUNK_TOKENS:
+            logger.info(f"Input has {token_count} tokens, using sentence-chunked translation")
+            return translate_long_text_with_mbart(text, source_lang, target_lang, profile=profile)
         
-        # Encode input text
-        encoded = tokenizer(text, return_tensors="pt", max_length=512, truncation=True)
-        
-        # Generate translation
-        with torch.no_grad():
-            generated_tokens = model.generate(
-                **encoded,
-                forced_bos_token_id=tokenizer.lang_code_to_id[target_lang],
-                max_length=200,
-                num_beams=4,
-                early_stopping=True,
-                do_sample=False
-            )
-        
-        # Decode translation
-        translated_text = tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)[0]
+        # Encode, generate and decode translation
+        translated_text = _mbart_generate(model, tokenizer, [text], source_lang, target_lang, profile)[0]
         
         logger.info(f"MBART translation successful: '{translated_text}'")
-        return translated_text.strip()
+        return translated_text
         
     except Exception as e:
         logger.error(f"MBART translation error: {e}")
         raise Exception(f"MBART translation failed: {str(e)}")
 
-def test_connection(url, timeout=10):
-    """Test if we can connect to the API endpoint"""
+def _tokenize_for_mbart(tokenizer, texts, source_lang):
+    """
+    Return ``[src_lang] tokens </s>`` id lists for each text
+
+    The language token is added per request instead of through the shared
+    ``tokenizer.src_lang``, and truncation/padding are done here rather than
+    by the tokenizer (which would reconfigure its shared backend), so the
+    tokenizer can be used from many threads at once.
+    """
+    lang_id = tokenizer.lang_code_to_id[source_lang]
+    body_length = MBART_MAX_INPUT_TOKENS - 2
+    token_ids = tokenizer(list(texts), add_special_tokens=False)["input_ids"]
+    return [[lang_id] + ids[:body_length] + [tokenizer.eos_token_id] for ids in token_ids]
+
+def _encode_for_mbart(tokenizer, texts, source_lang):
+    """Encode texts into right-padded ``input_ids``/``attention_mask`` tensors"""
+    import torch
+
+    sequences = _tokenize_for_mbart(tokenizer, texts, source_lang)
+
+    # Pad only to the longest text in this batch
+    longest = max(len(sequence) for sequence in sequences)
+    input_ids = torch.full((len(sequences), longest), tokenizer.pad_token_id, dtype=torch.long)
+    attention_mask = torch.zeros((len(sequences), longest), dtype=torch.long)
+    for row, sequence in enumerate(sequences):
+        input_ids[row, :len(sequence)] = torch.tensor(sequence, dtype=torch.long)
+        attention_mask[row, :len(sequence)] = 1
+
+    return {"input_ids": input_ids, "attention_mask": attention_mask}
+
+def _mbart_generate(model, tokenizer, texts, source_lang, target_lang, profile=None):
+    """Encode, generate and decode one batch of texts for a single language pair"""
+    import torch
+
+    profile = _resolve_profile(profile)
+    encoded = _encode_for_mbart(tokenizer, texts, source_lang)
+
+    started = time.perf_counter()
+    with torch.no_grad():
+        generated_tokens = model.generate(
+            **encoded,
+            forced_bos_token_id=tokenizer.lang_code_to_id[target_lang],
+            do_sample=False,
+            **_generate_kwargs(profile, encoded["input_ids"].shape[1])
+        )
+    _record_throughput(profile, generated_tokens.shape[1], time.perf_counter() - started)
+
+    return [t.strip() for t in tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)]
+
+def translate_batch_with_mbart(texts, source_lang, target_lang, batch_size=16, profile=None, latency_budget=None):
+    """
+    Translate many texts with local MBART, batching by language pair and length
+
+    Inputs are grouped by (source, target) pair and sorted by token length.
+    Each bucket of up to ``batch_size`` texts is padded only to its own
+    longest member and translated with a single ``model.generate`` call.
+    Inputs over MBART_CHUNK_TOKENS are split into sentence chunks that join
+    the buckets, so nothing is truncated.
+
+    Args:
+        texts (list): Texts to translate
+        source_lang (str or list): Source language code, or one code per text
+        target_lang (str or list): Target language code, or one code per text
+        batch_size (int): Maximum number of texts per ``generate`` call
+        profile (str): Decoding profile, as for ``translate_text_with_mbart``
+        latency_budget (float): Seconds allowed for decoding, used by 'auto'
+
+    Returns:
+        list: Translated texts, in the same order as ``texts``
+    """
+    texts = list(texts)
+    if not texts:
+        return []
+
+    source_langs = [source_lang] * len(texts) if isinstance(source_lang, str) else list(source_lang)
+    target_langs = [target_lang] * len(texts) if isinstance(target_lang, str) else list(target_lang)
+    if len(source_langs) != len(texts) or len(target_langs) != len(texts):
+        raise ValueError("source_lang and target_lang must be a single code or one code per text")
+
     try:
-        parsed_url = urlparse(url)
-        test_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-        
-        response = requests.get(test_url, timeout=timeout)
+        for text in texts:
+            if not text or not text.strip():
+                raise ValueError("Input text is empty")
+
+        profile = _resolve_profile(profile, texts, latency_budget)
+        params = MBART_DECODING_PROFILES[profile]
+        results = [None] * len(texts)
+
+        # Serve cached translations first; only the misses reach the model
+        pending = []
+        for index, (text, src, tgt) in enumerate(zip(texts, source_langs, target_langs)):
+            cached = lookup_translation(text, src, tgt, _mbart_backend_name(), params)
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append(index)
+
+        if not pending:
+            return results
+
+        logger.info(f"Batch translating {len(pending)} texts with local MBART ({len(texts) - len(pending)} cached)")
+
+        model, tokenizer = load_mbart_model()
+
+        # Group input positions by language pair
+        groups = {}
+        for index in pending:
+            groups.setdefault((source_langs[index], target_langs[index]), []).append(index)
+
+        for (src, tgt), indices in groups.items():
+            if src not in tokenizer.lang_code_to_id:
+                raise ValueError(f"Unsupported source language: {src}")
+            if tgt not in tokenizer.lang_code_to_id:
+                raise ValueError(f"Unsupported target language: {tgt}")
+
+            # Long inputs would be truncated: split them into sentence chunks
+            # that are batched with the other inputs, as in the single-text path
+            units = []  # (input position, text or chunk)
+            token_counts = tokenizer([texts[i] for i in indices], add_special_tokens=False)["input_ids"]
+            for i, ids in zip(indices, token_counts):
+                if len(ids) > MBART_CHUNK_TOKENS:
+                    chunks = _chunk_sentences(tokenizer, split_sentences(texts[i]))
+                    logger.info(f"Batch input of {len(ids)} tokens split into {len(chunks)} chunks")
+                    units.extend((i, chunk) for chunk in chunks)
+                else:
+                    units.append((i, texts[i]))
+
+            # Sort by token length so each bucket holds similarly sized inputs
+            lengths = _tokenize_for_mbart(tokenizer, [unit_text for _, unit_text in units], src)
+            ordered = [unit for _, unit in sorted(zip((len(ids) for ids in lengths), range(len(units))))]
+
+            pieces = [None] * len(units)
+            for start in range(0, len(ordered), batch_size):
+                bucket = ordered[start:start + batch_size]
+                decoded = _mbart_generate(model, tokenizer, [units[u][1] for u in bucket], src, tgt, profile)
+                for u, translated_text in zip(bucket, decoded):
+                    pieces[u] = translated_text
+
+            # Stitch chunks back together in order
+            joined = {}
+            for (i, _), translated_text in zip(units, pieces):
+                joined.setdefault(i, []).append(translated_text)
+            for i in indices:
+                results[i] = " ".join(piece for piece in joined[i] if piece)
+                store_translation(texts[i], src, tgt, _mbart_backend_name(), results[i], params)
+
+            logger.info(f"MBART batch of {len(indices)} texts translated from {src} to {tgt}")
+
+        return results
+
+    except Exception as e:
+        logger.error(f"MBART batch translation error: {e}")
+        raise Exception(f"MBART batch translation failed: {str(e)}")
+
+def translate_text_to_many_with_mbart(text, source_lang, target_langs, profile=None):
+    """
+    Translate one text into several target languages, running the encoder once
+
+    The encoder output is shared by every target and all targets are decoded
+    in a single batched ``generate`` call, each row starting with its own
+    target language token.
+
+    Args:
+        text (str): Text to translate
+        source_lang (str): Source language code (e.g., 'en_XX')
+        target_langs (list): Target language codes (e.g., ['fr_XX', 'es_XX'])
+        profile (str): Decoding profile, as for ``translate_text_with_mbart``
+
+    Returns:
+        dict: Target language code -> translated text
+    """
+    try:
+        if not text or not text.strip():
+            raise ValueError("Input text is empty")
+
+        target_langs = list(dict.fromkeys(target_langs))
+        profile = _resolve_profile(profile, [text])
+        params = MBART_DECODING_PROFILES[profile]
+
+        results = {}
+        pending = []
+        for target_lang in target_langs:
+            cached = lookup_translation(text, source_lang, target_lang, _mbart_backend_name(), params)
+            if cached is not None:
+                results[target_lang] = cached
+            else:
+                pending.append(target_lang)
+
+        if not pending:
+            return results
+
+        logger.info(f"Translating with local MBART: '{text}' from {source_lang} to {', '.join(pending)}")
+
+        model, tokenizer = load_mbart_model()
+
+        for lang in [source_lang] + pending:
+            if lang not in tokenizer.lang_code_to_id:
+                raise ValueError(f"Unsupported language: {lang}")
+
+        # The shared-encoder path feeds an expanded torch encoder output back
+        # into generate. That is only relied on for the transformers model
+        # (fp32, int8, pruned); the ONNX Runtime model (MBART_BACKEND=onnx)
+        # also has get_encoder, but decodes one batch per target instead
+        from transformers import MBartForConditionalGeneration
+
+        if isinstance(model, MBartForConditionalGeneration):
+            translations = _mbart_generate_many(model, tokenizer, text, source_lang, pending, profile)
+        else:
+            translations = [_mbart_generate(model, tokenizer, [text], source_lang, lang, profile)[0] for lang in pending]
+
+        for target_lang, translated_text in zip(pending, translations):
+            results[target_lang] = translated_text
+            store_translation(text, source_lang, target_lang, _mbart_backend_name(), translated_text, params)
+
+        logger.info(f"MBART multi-target translation successful: {results}")
+        return {target_lang: results[target_lang] for target_lang in target_langs}
+
+    except Exception as e:
+        logger.error(f"MBART multi-target translation error: {e}")
+        raise Exception(f"MBART multi-target translation failed: {str(e)}")
+
+def _mbart_generate_many(model, tokenizer, text, source_lang, target_langs, profile):
+    """Run the encoder once and decode every target language in one batch"""
+    import torch
+    from transformers.modeling_outputs import BaseModelOutput
+
+    encoded = _encode_for_mbart(tokenizer, [text], source_lang)
+    count = len(target_langs)
+
+    started = time.perf_counter()
+    with torch.no_grad():
+        encoder_outputs = model.get_encoder()(**encoded)
+
+        # expand() shares the single encoder result across all target rows
+        hidden_states = encoder_outputs.last_hidden_state.expand(count, -1, -1)
+        attention_mask = encoded["attention_mask"].expand(count, -1)
+        decoder_input_ids = torch.tensor(
+            [[model.config.decoder_start_token_id, tokenizer.lang_code_to_id[lang]] for lang in target_langs],
+            dtype=torch.long
+        )
+
+        generated_tokens = model.generate(
+            encoder_outputs=BaseModelOutput(last_hidden_state=hidden_states),
+            attention_mask=attention_mask,
+            decoder_input_ids=decoder_input_ids,
+            do_sample=False,
+            **_generate_kwargs(profile, encoded["input_ids"].shape[1])
+        )
+    _record_throughput(profile, generated_tokens.shape[1], time.perf_counter() - started)
+
+    return [t.strip() for t in tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)]
+
+def stream_translate_with_mbart(text, source_lang, target_lang):
+    """
+    Translate text with local MBART, yielding text increments as they decode
+
+    Uses the greedy "realtime" profile with a token streamer so callers can
+    show (or speak) the translation before generation has finished. Inputs
+    longer than MBART_CHUNK_TOKENS are split into sentence chunks, as in
+    ``translate_long_text_with_mbart``, and streamed one chunk after another
+    so nothing is truncated.
+
+    Args:
+        text (str): Text to translate
+        source_lang (str): Source language code (e.g., 'en_XX')
+        target_lang (str): Target language code (e.g., 'es_XX')
+
+    Yields:
+        str: Newly decoded text, in order
+    """
+    if not text or not text.strip():
+        raise ValueError("Input text is empty")
+
+    params = MBART_DECODING_PROFILES['realtime']
+    cached = lookup_translation(text, source_lang, target_lang, _mbart_backend_name(), params)
+    if cached is not None:
+        yield cached
+        return
+
+    logger.info(f"Streaming MBART translation: '{text}' from {source_lang} to {target_lang}")
+
+    model, tokenizer = load_mbart_model()
+
+    if source_lang not in tokenizer.lang_code_to_id:
+        raise ValueError(f"Unsupported source language: {source_lang}")
+    if target_lang not in tokenizer.lang_code_to_id:
+        raise ValueError(f"Unsupported target language: {target_lang}")
+
+    chunks = [text]
+    token_count = len(tokenizer(text, add_special_tokens=False)["input_ids"])
+    if token_count > MBART_CHUNK_TOKENS:
+        chunks = _chunk_sentences(tokenizer, split_sentences(text))
+        logger.info(f"Input has {token_count} tokens, streaming {len(chunks)} sentence chunks")
+
+    translations = []
+    for chunk in chunks:
+        pieces = []
+        for new_text in _stream_mbart_chunk(model, tokenizer, chunk, source_lang, target_lang):
+            if not pieces and translations:
+                # Separate chunk translations as translate_long_text_with_mbart does
+                new_text = " " + new_text.lstrip()
+            pieces.append(new_text)
+            yield new_text
+        translation = "".join(pieces).strip()
+        if translation:
+            translations.append(translation)
+
+    translated_text = " ".join(translations)
+    logger.info(f"MBART streaming translation complete: '{translated_text}'")
+    store_translation(text, source_lang, target_lang, _mbart_backend_name(), translated_text, params)
+
+def _stream_mbart_chunk(model, tokenizer, text, source_lang, target_lang):
+    """Generate one chunk with the "realtime" profile, yielding decoded increments"""
+    import torch
+    from transformers import TextIteratorStreamer
+
+    encoded = _encode_for_mbart(tokenizer, [text], source_lang)
+
+    streamer = TextIteratorStreamer(tokenizer, skip_special_tokens=True)
+    errors = []
+
+    def generate():
+        try:
+            with torch.no_grad():
+                model.generate(
+                    **encoded,
+                    forced_bos_token_id=tokenizer.lang_code_to_id[target_lang],
+                    do_sample=False,
+                    streamer=streamer,
+                    **_generate_kwargs('realtime', encoded["input_ids"].shape[1])
+                )
+        except Exception as e:
+            errors.append(e)
+            # Unblock the consumer loop
+            streamer.end()
+
+    thread = threading.Thread(target=generate, daemon=True)
+    thread.start()
+
+    for new_text in streamer:
+        if new_text:
+            yield new_text
+    thread.join()
+
+    if errors:
+        logger.error(f"MBART streaming error: {errors[0]}")
+        raise Exception(f"MBART streaming translation failed: {str(errors[0])}")
+
+def split_sentences(text):
+    """Split text into sentences on terminal punctuation and line breaks"""
+    sentences = re.split(r'(?<=[.!?\u2026])\s+|(?<=[\u3002\uff01\uff1f])\s*|\n+', text)
+    return [sentence.strip() for sentence in sentences if sentence and sentence.strip()]
+
+def _chunk_sentences(tokenizer, sentences, max_tokens=MBART_CHUNK_TOKENS):
+    """Split any sentence longer than ``max_tokens`` tokens at word boundaries"""
+    chunks = []
+    for sentence in sentences:
+        if len(tokenizer(sentence, add_special_tokens=False)["input_ids"]) <= max_tokens:
+            chunks.append(sentence)
+            continue
+
+        current = []
+        current_tokens = 0
+        for word in sentence.split():
+            word_tokens = len(tokenizer(word, add_special_tokens=False)["input_ids"])
+            if current and current_tokens + word_tokens > max_tokens:
+                chunks.append(" ".join(current))
+                current = []
+                current_tokens = 0
+            current.append(word)
+            current_tokens += word_tokens
+        if current:
+            chunks.append(" ".join(current))
+
+    return chunks
+
+def translate_long_text_with_mbart(text, source_lang, target_lang, on_preview=None, batch_size=16, profile=None):
+    """
+    Translate arbitrarily long text by splitting it into sentences
+
+    The sentences are translated as a batch and stitched back together in
+    order, so nothing is truncated and latency follows the longest sentence
+    rather than the total length.
+
+    Args:
+        text (str): Text to translate
+        source_lang (str): Source language code (e.g., 'en_XX')
+        target_lang (str): Target language code (e.g., 'es_XX')
+        on_preview (callable): Called with the first chunk's translation as
+            soon as it is ready, before the remaining chunks are translated
+        batch_size (int): Maximum number of chunks per ``generate`` call
+        profile (str): Decoding profile, as for ``translate_text_with_mbart``
+
+    Returns:
+        str: Translated text
+    """
+    if not text or not text.strip():
+        raise ValueError("Input text is empty")
+
+    _, tokenizer = load_mbart_model()
+    chunks = _chunk_sentences(tokenizer, split_sentences(text))
+    logger.info(f"Translating long text as {len(chunks)} chunks from {source_lang} to {target_lang}")
+
+    if on_preview is not None and len(chunks) > 1:
+        translations = translate_batch_with_mbart(chunks[:1], source_lang, target_lang, profile=profile)
+        on_preview(translations[0])
+        translations += translate_batch_with_mbart(chunks[1:], source_lang, target_lang, batch_size, profile)
+    else:
+        translations = translate_batch_with_mbart(chunks, source_lang, target_lang, batch_size, profile)
+        if on_preview is not None and translations:
+            on_preview(translations[0])
+
+    return " ".join(translation for translation in translations if translation)
+
+def _spitch_retry():
+    """
+    Retry policy for Spitch calls: jittered exponential backoff on 429/5xx
+
+    Only failures where the POST cannot have been processed are retried:
+    connection errors and the statuses in SPITCH_RETRY_STATUSES (honouring
+    Retry-After). Read timeouts and dropped responses are not retried, so a
+    call never blocks for more than one read timeout.
+    """
+    options = dict(
+        total=SPITCH_HTTP_RETRIES,
+        connect=SPITCH_HTTP_RETRIES,
+        read=False,
+        other=0,
+        status=SPITCH_HTTP_RETRIES,
+        status_forcelist=SPITCH_RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "POST"]),
+        backoff_factor=SPITCH_BACKOFF_FACTOR,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    try:
+        return Retry(backoff_jitter=SPITCH_BACKOFF_FACTOR, **options)
+    except TypeError:
+        # urllib3 < 2 has no backoff_jitter; retries still back off exponentially
+        return Retry(**options)
+
+def get_spitch_session():
+    """
+    Return the process-wide HTTP session used for all Spitch requests
+
+    The session keeps up to SPITCH_HTTP_POOL_SIZE connections alive per host,
+    so repeated calls skip the TCP/TLS handshake, and retries transient
+    failures. Safe to share between threads.
+    """
+    global _spitch_session
+
+    if _spitch_session is None:
+        with _spitch_session_lock:
+            if _spitch_session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=SPITCH_HTTP_POOL_SIZE,
+                    pool_maxsize=SPITCH_HTTP_POOL_SIZE,
+                    max_retries=_spitch_retry()
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Authorization": f"Bearer {SPITCH_API_KEY}"})
+                _spitch_session = session
+    return _spitch_session
+
+def _spitch_timeout():
+    return (SPITCH_CONNECT_TIMEOUT, SPITCH_READ_TIMEOUT)
+
+def test_connection(url, timeout=10, use_cache=True):
+    """
+    Test if we can connect to the API endpoint
+
+    Results are cached per host for CONNECTION_TEST_TTL seconds; pass
+    ``use_cache=False`` to force a fresh request.
+    """
+    parsed_url = urlparse(url)
+    test_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    if use_cache:
+        cached = _connection_status.get(test_url)
+        if cached is not None and time.monotonic() - cached[1] < CONNECTION_TEST_TTL:
+            return cached[0]
+
+    try:
+        response = get_spitch_session().get(test_url, timeout=timeout)
         logger.info(f"Connection test successful to {test_url}")
-        return True
+        reachable = True
     except requests.exceptions.ConnectionError:
         logger.error(f"Cannot connect to {test_url}")
-        return False
+        reachable = False
     except requests.exceptions.Timeout:
         logger.error(f"Connection timeout to {test_url}")
-        return False
+        reachable = False
     except Exception as e:
         logger.error(f"Connection test failed: {e}")
-        return False
+        reachable = False
+
+    _connection_status[test_url] = (reachable, time.monotonic())
+    return reachable
+
+def spitch_health_probe():
+    """Background circuit-breaker probe for the Spitch backends"""
+    return test_connection(SPITCH_BASE_URL, timeout=SPITCH_CONNECT_TIMEOUT, use_cache=False)
+
+class SpitchHTTPError(Exception):
+    """Non-200 response from the Spitch REST API"""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+def is_spitch_outage(error):
+    """
+    Return True if ``error`` means Spitch itself is failing
+
+    Only connection errors, timeouts, 429 and 5xx responses count (for the
+    REST, httpx and SDK clients, following wrapped causes). Other 4xx
+    responses and content errors are about the request and must not open
+    the shared circuit for every session.
+    """
+    transport_errors = [requests.exceptions.ConnectionError, requests.exceptions.Timeout]
+    try:
+        import httpx
+        transport_errors.append(httpx.TransportError)
+    except ImportError:
+        pass
+    try:
+        import spitch
+        transport_errors.append(spitch.APIConnectionError)
+    except ImportError:
+        pass
+
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        status_code = getattr(error, "status_code", None)
+        if isinstance(status_code, int):
+            return status_code == 429 or status_code >= 500
+        if isinstance(error, tuple(transport_errors)):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+def spitch_circuit_breaker(backend):
+    """Circuit breaker for a Spitch backend ('translate', 'stt' or 'tts')"""
+    return get_circuit_breaker(f"spitch-{backend}", probe=spitch_health_probe, is_failure=is_spitch_outage)
 
 def translate_text_with_spitch_api(text, source_lang, target_lang):
     """
     Translate text using Spitch API with improved error handling and API format
     """
+    return cached_translation(
+        text, source_lang, target_lang, "spitch",
+        lambda: translate_text_with_spitch_uncached(text, source_lang, target_lang)
+    )
+
+def translate_text_with_spitch_uncached(text, source_lang, target_lang):
+    """Call Spitch through its circuit breaker, bypassing the translation cache"""
+    return spitch_circuit_breaker("translate").call(_translate_text_with_spitch_api, text, source_lang, target_lang)
+
+def build_spitch_translate_request(text, source_lang, target_lang):
+    """
+    Build the Spitch translation request shared by the sync and async clients
+
+    Returns:
+        tuple: (url, headers, body bytes)
+    """
     if not text or not text.strip():
         raise ValueError("Input text is empty")
     
-    logger.info(f"Translating with Spitch API: '{text}' from {source_lang} to {target_lang}")
-    
     headers = {
         "Authorization": f"Bearer {SPITCH_API_KEY}",
         "Content-Type": "application/json"
@@ -151,48 +1076,56 @@ def translate_text_with_spitch_api(text, source_lang, target_lang):
         "target": target_lang
     }
     
+    # Convert payload to JSON manually to avoid 'json' parameter issue; as
+    # bytes so headers and body go out in one write on a kept-alive socket
+    return f"{SPITCH_BASE_URL}/translate", headers, json.dumps(payload).encode("utf-8")
+
+def parse_spitch_translate_response(status_code, body):
+    """Extract the translation from a Spitch response (shared by sync and async)"""
+    if status_code != 200:
+        logger.error(f"API error {status_code}: {body}")
+        raise SpitchHTTPError(f"Translation failed: HTTP {status_code} - {body}", status_code)
+    
     try:
-        # Convert payload to JSON string manually to avoid 'json' parameter issue
-        json_payload = json.dumps(payload)
-        
-        response = requests.post(
-            f"{SPITCH_BASE_URL}/translate",
+        result = json.loads(body)
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse JSON response: {e}")
+        raise Exception(f"Translation failed: Invalid JSON response")
+    
+    # Try multiple possible response field names
+    translated_text = (
+        result.get('translated_text') or 
+        result.get('translation') or 
+        result.get('output') or 
+        result.get('text') or
+        result.get('result', '')
+    )
+    
+    if not translated_text:
+        logger.error(f"No translated text found in response: {result}")
+        raise Exception("Translation failed: No translated text found")
+    
+    logger.info(f"Translation successful: '{translated_text}'")
+    return translated_text.strip()
+
+def _translate_text_with_spitch_api(text, source_lang, target_lang):
+    """Call the Spitch translation endpoint (uncached)"""
+    url, headers, body = build_spitch_translate_request(text, source_lang, target_lang)
+    
+    logger.info(f"Translating with Spitch API: '{text}' from {source_lang} to {target_lang}")
+    
+    try:
+        response = get_spitch_session().post(
+            url,
             headers=headers,
-            data=json_payload,  # Use 'data' instead of 'json'
-            timeout=30
+            data=body,  # Use 'data' instead of 'json'
+            timeout=_spitch_timeout()
         )
-        
-        if response.status_code == 200:
-            result = response.json()
-            
-            # Try multiple possible response field names
-            translated_text = (
-                result.get('translated_text') or 
-                result.get('translation') or 
-                result.get('output') or 
-                result.get('text') or
-                result.get('result', '')
-            )
-            
-            if translated_text:
-                logger.info(f"Translation successful: '{translated_text}'")
-                return translated_text.strip()
-            else:
-                logger.error(f"No translated text found in response: {result}")
-                raise Exception("Translation failed: No translated text found")
-        else:
-            logger.error(f"API error {response.status_code}: {response.text}")
-            raise Exception(f"Translation failed: HTTP {response.status_code} - {response.text}")
-    
     except requests.exceptions.RequestException as e:
         logger.error(f"Request failed: {e}")
-        raise Exception(f"Translation request failed: {str(e)}")
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse JSON response: {e}")
-        raise Exception(f"Translation failed: Invalid JSON response")
-    except Exception as e:
-        logger.error(f"Translation failed: {e}")
-        raise
+        raise Exception(f"Translation request failed: {str(e)}") from e
+    
+    return parse_spitch_translate_response(response.status_code, response.text)
 
 def translate_text_with_spitch_sdk():
     """
@@ -200,21 +1133,14 @@ def translate_text_with_spitch_sdk():
     Install with: pip install spitch
     """
     try:
-        import spitch
+        from spitch_client import get_spitch_client, spitch_translate
         
-        # Initialize client
-        client = spitch.Client(api_key=SPITCH_API_KEY)
+        # Create (or reuse) the shared client up front so setup errors surface here
+        get_spitch_client(SPITCH_API_KEY)
         
         def translate_with_sdk(text, source_lang, target_lang):
             logger.info(f"Using Spitch SDK: '{text}' from {source_lang} to {target_lang}")
-            
-            response = client.translate(
-                text=text,
-                source_language=source_lang,
-                target_language=target_lang
-            )
-            
-            return response.translated_text
+            return spitch_translate(text, source_lang, target_lang, api_key=SPITCH_API_KEY)
         
         return translate_with_sdk
         
@@ -270,7 +1196,7 @@ def test_spitch_connection():
                 "target": "yo"
             })
             
-            response = requests.post(endpoint, headers=headers, data=payload, timeout=10)
+            response = get_spitch_session().post(endpoint, headers=headers, data=payload, timeout=(SPITCH_CONNECT_TIMEOUT, 10))
             
             if response.status_code == 200:
                 result = response.json()
@@ -296,125 +1222,17 @@ def translate_text_fallback(text, source_lang, target_lang):
     Returns:
         str: Fallback translated text
     """
+    # Not cached: a trie lookup is cheaper than a SQLite round trip, and
+    # cached results would outlive edits to the phrase tables
     logger.info(f"Using fallback translation: '{text}' from {source_lang} to {target_lang}")
     
     # Clean language codes (remove _XX suffixes for MBART codes)
     clean_source = source_lang.split('_')[0] if '_' in source_lang else source_lang
     clean_target = target_lang.split('_')[0] if '_' in target_lang else target_lang
     
-    # Enhanced word-by-word translation dictionary for common phrases
-    translations = {
-        'en_yo': {
-            'hello': 'bawo',
-            'hi': 'bawo',
-            'how': 'bawo',
-            'are': 'se',
-            'you': 'o',
-            'where': 'nibo',
-            'going': 'lo',
-            'go': 'lo',
-            'come': 'wa',
-            'back': 'pada',
-            'here': 'ibi',
-            'please': 'je ka',
-            'good': 'dara',
-            'morning': 'aro',
-            'afternoon': 'osan',
-            'evening': 'ale',
-            'night': 'oru',
-            'thank': 'o se',
-            'thanks': 'o se',
-            'welcome': 'kaabo',
-            'sorry': 'ma binu',
-            'yes': 'beeni',
-            'no': 'rara',
-            'what': 'kini',
-            'when': 'nigbati',
-            'why': 'kilode',
-            'who': 'tani',
-            'to': 'si'
-        },
-        'yo_en': {
-            'bawo': 'hello',
-            'se': 'are',
-            'o': 'you',
-            'nibo': 'where',
-            'lo': 'going',
-            'wa': 'come',
-            'pada': 'back',
-            'ibi': 'here',
-            'dara': 'good',
-            'aro': 'morning',
-            'osan': 'afternoon',
-            'ale': 'evening',
-            'oru': 'night',
-            'kaabo': 'welcome',
-            'beeni': 'yes',
-            'rara': 'no',
-            'kini': 'what',
-            'nigbati': 'when',
-            'kilode': 'why',
-            'tani': 'who'
-        },
-        'en_es': {
-            'hello': 'hola',
-            'how': 'como',
-            'are': 'estas',
-            'you': 'tu',
-            'where': 'donde',
-            'going': 'vas',
-            'good': 'bueno',
-            'morning': 'mañana',
-            'thank': 'gracias',
-            'welcome': 'bienvenido',
-            'please': 'por favor',
-            'sorry': 'lo siento',
-            'yes': 'si',
-            'no': 'no',
-            'what': 'que',
-            'when': 'cuando',
-            'why': 'por que',
-            'who': 'quien'
-        },
-        'es_en': {
-            'hola': 'hello',
-            'como': 'how',
-            'estas': 'are',
-            'tu': 'you',
-            'donde': 'where',
-            'vas': 'going',
-            'bueno': 'good',
-            'mañana': 'morning',
-            'gracias': 'thank you',
-            'bienvenido': 'welcome',
-            'si': 'yes',
-            'no': 'no',
-            'que': 'what',
-            'cuando': 'when',
-            'quien': 'who'
-        }
-    }
-    
-    translation_key = f"{clean_source}_{clean_target}"
-    word_translations = translations.get(translation_key, {})
-    
-    if word_translations:
-        words = text.lower().split()
-        translated_words = []
-        
-        for word in words:
-            # Remove punctuation for lookup
-            clean_word = word.strip('.,!?;:"\'')
-            translated_word = word_translations.get(clean_word, word)
-            
-            # Preserve punctuation
-            if word != clean_word:
-                punctuation = word[len(clean_word):]
-                translated_word += punctuation
-                
-            translated_words.append(translated_word)
-        
-        result = ' '.join(translated_words)
+    table = get_phrase_table(clean_source, clean_target)
+    if table is not None:
+        result = table.translate(text)
     else:
         # For unsupported language pairs, return a formatted version
         result = f"[{clean_source}→{clean_target}] {text}"
@@ -422,6 +1240,42 @@ def translate_text_fallback(text, source_lang, target_lang):
     logger.info(f"Fallback translation result: '{result}'")
     return result
 
+def translate_text_with_phrase_table(text, source_lang, target_lang):
+    """
+    Phrase-table translation that only answers with a real table hit
+
+    Returns:
+        str or None: None when the pair has no table or no phrase matched,
+            so callers never mistake the untranslated source for a result
+    """
+    clean_source = source_lang.split('_')[0] if '_' in source_lang else source_lang
+    clean_target = target_lang.split('_')[0] if '_' in target_lang else target_lang
+
+    table = get_phrase_table(clean_source, clean_target)
+    if table is None:
+        return None
+    return table.lookup(text)
+
+def translate_batch_fallback(texts, source_lang, target_lang):
+    """
+    Fallback-translate a list of texts with a single phrase-table lookup
+
+    Args:
+        texts (list): Texts to translate
+        source_lang (str): Source language code
+        target_lang (str): Target language code
+
+    Returns:
+        list: Translations in the same order as ``texts``
+    """
+    clean_source = source_lang.split('_')[0] if '_' in source_lang else source_lang
+    clean_target = target_lang.split('_')[0] if '_' in target_lang else target_lang
+
+    table = get_phrase_table(clean_source, clean_target)
+    if table is None:
+        return [f"[{clean_source}→{clean_target}] {text}" for text in texts]
+    return table.translate_batch(texts)
+
 def get_supported_languages():
     """Get lists of supported languages for each translation method"""
     mbart_languages = [
@@ -476,6 +1330,128 @@ def test_translations():
             except Exception as fe:
                 print(f" Fallback also failed: {fe}")
 
+def test_concurrent_translations(num_threads=16, requests_per_thread=4):
+    """
+    Stress-test concurrent MBART inference with mixed language pairs
+
+    A single-threaded pass records the encoded input ids and the translation
+    of every test case. Many threads then run the same cases at once through
+    translate_text_with_mbart, with the cache off, and every request must
+    reproduce its reference ids and output exactly.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    import translation_cache
+
+    test_cases = [
+        ("Hello, how are you?", "en_XX", "fr_XX"),
+        ("Bonjour, comment allez-vous ?", "fr_XX", "en_XX"),
+        ("Hola, ¿cómo estás?", "es_XX", "de_DE"),
+        ("Guten Morgen, wie geht es dir?", "de_DE", "es_XX"),
+        ("Thank you very much", "en_XX", "it_IT"),
+        ("Dank je wel", "nl_XX", "pt_XX")
+    ]
+
+    print(f" Testing concurrent MBART inference ({num_threads} threads)")
+    print("=" * 50)
+
+    model, tokenizer = load_mbart_model()
+
+    def encoded_ids(text, source):
+        return _encode_for_mbart(tokenizer, [text], source)["input_ids"][0].tolist()
+
+    # Cache hits would let threads skip the model entirely
+    cache_enabled = translation_cache.TRANSLATION_CACHE_ENABLED
+    translation_cache.TRANSLATION_CACHE_ENABLED = False
+    try:
+        reference = {
+            case: (encoded_ids(case[0], case[1]), translate_text_with_mbart(*case, profile="realtime"))
+            for case in test_cases
+        }
+
+        def run_request(index):
+            case = test_cases[index % len(test_cases)]
+            text, source, target = case
+            ids = encoded_ids(text, source)
+            translation = translate_text_with_mbart(text, source, target, profile="realtime")
+            expected_ids, expected_translation = reference[case]
+            return case, ids == expected_ids, translation == expected_translation
+
+        total = num_threads * requests_per_thread
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            results = list(executor.map(run_request, range(total)))
+    finally:
+        translation_cache.TRANSLATION_CACHE_ENABLED = cache_enabled
+
+    failures = [(case, ids_ok, output_ok) for case, ids_ok, output_ok in results if not (ids_ok and output_ok)]
+    for (text, source, target), ids_ok, output_ok in failures:
+        problem = "input ids" if not ids_ok else "translation"
+        print(f" {source} → {target} '{text}': {problem} differs from the single-threaded reference")
+
+    print(f"\n {total - len(failures)}/{total} requests matched the single-threaded reference")
+    return not failures
+
+def test_spitch_circuit_breaker():
+    """Check that client errors pass through while outages open the breaker"""
+    from circuit_breaker import CircuitBreaker, OPEN, CLOSED
+
+    def fail_with(error):
+        def call():
+            raise error
+        return call
+
+    cases = [
+        ("HTTP 400 bad request", SpitchHTTPError("Translation failed: HTTP 400", 400), CLOSED),
+        ("HTTP 401 unauthorized", SpitchHTTPError("Translation failed: HTTP 401", 401), CLOSED),
+        ("no translated text", Exception("Translation failed: No translated text found"), CLOSED),
+        ("HTTP 429 rate limited", SpitchHTTPError("Translation failed: HTTP 429", 429), OPEN),
+        ("HTTP 503 unavailable", SpitchHTTPError("Translation failed: HTTP 503", 503), OPEN),
+        ("connection refused", requests.exceptions.ConnectionError("Connection refused"), OPEN),
+    ]
+
+    print(" Testing Spitch circuit breaker error classification")
+    print("=" * 50)
+
+    results = []
+    for name, error, expected in cases:
+        breaker = CircuitBreaker(f"test-{name}", failure_threshold=3, is_failure=is_spitch_outage)
+        for _ in range(3):
+            try:
+                breaker.call(fail_with(error))
+            except Exception:
+                pass
+        ok = breaker.state == expected
+        results.append(ok)
+        print(f" 3 x {name}: {breaker.state} (expected {expected}) {'OK' if ok else 'FAIL'}")
+
+    print(f"\n {sum(results)}/{len(results)} cases passed")
+    return all(results)
+
+def test_long_text_streaming():
+    """Stream an input longer than the MBART encoder limit and check nothing is dropped"""
+    import translation_cache
+
+    sentences = [f"This is sentence number {i} of a long story about the river and the town." for i in range(1, 41)]
+    text = " ".join(sentences)
+
+    print(" Testing streamed translation of long text")
+    print("=" * 50)
+
+    _, tokenizer = load_mbart_model()
+    token_count = len(tokenizer(text, add_special_tokens=False)["input_ids"])
+    print(f" Input: {len(sentences)} sentences, {token_count} tokens (limit {MBART_MAX_INPUT_TOKENS - 2})")
+
+    cache_enabled = translation_cache.TRANSLATION_CACHE_ENABLED
+    translation_cache.TRANSLATION_CACHE_ENABLED = False
+    try:
+        streamed = "".join(stream_translate_with_mbart(text, "en_XX", "fr_XX")).strip()
+        last_sentence = _translate_text_with_mbart(sentences[-1], "en_XX", "fr_XX", profile="realtime")
+    finally:
+        translation_cache.TRANSLATION_CACHE_ENABLED = cache_enabled
+
+    ok = token_count > MBART_MAX_INPUT_TOKENS - 2 and streamed.endswith(last_sentence)
+    print(f" Streamed {len(streamed)} characters; ends with the last sentence: {ok}")
+    return ok
+
 if __name__ == "__main__":
     # First test the connection
     print(" Testing Spitch API Connection")
@@ -1,6 +1,9 @@
 import speech_recognition as sr
-from Speech_translator import translate_text_with_mbart, translate_text_with_spitch, translate_text_fallback
+from Speech_translator import stream_translate_with_mbart, translate_text_fallback, start_mbart_warmup, MBART_WARMUP_ON_STARTUP
 from text_to_speech import text_to_speech
+from hedging import hedged_translate
+from audio_vad import trim_silence
+from continuous_capture import ContinuousCapture
 import logging
 from dotenv import load_dotenv
 import os
@@ -20,9 +23,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize speech recognition
+# Initialize speech recognition (the microphone is opened on first use)
 recognizer = sr.Recognizer()
-mic = sr.Microphone()
+mic = None
+
+def get_microphone():
+    """Create the shared microphone on first use"""
+    global mic
+    if mic is None:
+        mic = sr.Microphone()
+    return mic
 
 # Language configurations
 AFRICAN_LANGUAGES = {
@@ -114,7 +124,7 @@ def setup_microphone():
             print(f"  {i}: {name}")
         
         # Test microphone
-        with mic as source:
+        with get_microphone() as source:
             print(" Calibrating microphone for ambient noise...")
             recognizer.adjust_for_ambient_noise(source, duration=2)
             print(" Microphone setup complete")
@@ -129,20 +139,31 @@ def setup_microphone():
 def capture_and_recognize_speech(timeout=10, phrase_time_limit=5):
     """Capture audio and convert to text"""
     try:
-        with mic as source:
+        with get_microphone() as source:
             print(" Listening... Speak now!")
             audio = recognizer.listen(
                 source, 
                 timeout=timeout, 
                 phrase_time_limit=phrase_time_limit
             )
+
+        # Trim silence before STT; a capture with no speech never reaches the network
+        audio = trim_silence(audio)
+        if audio is None:
+            raise Exception("No speech detected in the captured audio")
             
+        return recognize_speech(audio)
+        
+    except sr.WaitTimeoutError:
+        raise Exception("No speech detected within timeout period")
+
+def recognize_speech(audio):
+    """Convert captured audio to text"""
+    try:
         print(" Converting speech to text...")
         text = recognizer.recognize_google(audio, language='en-US')
         return text.strip()
         
-    except sr.WaitTimeoutError:
-        raise Exception("No speech detected within timeout period")
     except sr.UnknownValueError:
         raise Exception("Could not understand the audio")
     except sr.RequestError as e:
@@ -156,23 +177,24 @@ def translate_text(text, source_lang, target_lang, source_type, target_type):
         
         # Determine translation method
         if source_type.lower() == "others" and target_type.lower() == "others":
-            # Both are non-African languages - use MBART
-            translation = translate_text_with_mbart(text, source_lang, target_lang)
-            print(f" MBART Translation: '{translation}'")
+            # Both are non-African languages - use MBART, printing words as they decode
+            print(" MBART Translation: ", end="", flush=True)
+            pieces = []
+            for piece in stream_translate_with_mbart(text, source_lang, target_lang):
+                pieces.append(piece)
+                print(piece, end="", flush=True)
+            print()
+            translation = "".join(pieces).strip()
             
         else:
             # At least one is African language - try Spitch first
             spitch_available = bool(os.getenv('SPITCH_API_KEY'))
             
             if spitch_available:
-                try:
-                    translation = translate_text_with_spitch(text, source_lang, target_lang)
-                    print(f" Spitch Translation: '{translation}'")
-                except Exception as e:
-                    logger.warning(f"Spitch failed: {e}")
-                    print(f" Spitch failed, using fallback...")
-                    translation = translate_text_fallback(text, source_lang, target_lang)
-                    print(f" Fallback Translation: '{translation}'")
+                # Spitch, hedged with the fallback translator when it runs slow or fails
+                result = hedged_translate(text, source_lang, target_lang)
+                translation = result.text
+                print(f" {result.backend.capitalize()} Translation: '{translation}' ({result.latency:.2f}s)")
             else:
                 print(" Spitch API not available, using fallback...")
                 translation = translate_text_fallback(text, source_lang, target_lang)
@@ -208,6 +230,49 @@ def convert_to_speech(text, target_lang):
         print(f" Speech conversion error: {e}")
         return False
 
+def run_continuous_session(source_lang, target_lang, source_type, target_type):
+    """Translate utterances as they are segmented from a continuous capture"""
+    print("\n Listening continuously... Pause between sentences, press Ctrl+C to stop")
+    
+    capture = ContinuousCapture(get_microphone())
+    try:
+        with capture:
+            while True:
+                utterance = capture.get(timeout=1.0)
+                if utterance is None:
+                    continue
+                
+                try:
+                    print(f"\n--- Utterance {utterance.index} ({utterance.duration:.1f}s, {capture.pending()} waiting) ---")
+                    recognized_text = recognize_speech(utterance.audio)
+                    print(f" Recognized: '{recognized_text}'")
+                    
+                    translation = translate_text(
+                        recognized_text, source_lang, target_lang,
+                        source_type, target_type
+                    )
+                    
+                    print("=" * 60)
+                    print(f" ORIGINAL  : {recognized_text}")
+                    print(f" TRANSLATED: {translation}")
+                    print("=" * 60)
+                    
+                    # Recording continues during playback, but the speaker output is not segmented
+                    with capture.muted():
+                        speech_success = convert_to_speech(translation, target_lang)
+                    if not speech_success:
+                        print(f" Speech output failed, you can read the translation: '{translation}'")
+                        
+                except Exception as e:
+                    print(f" Error in utterance {utterance.index}: {e}")
+                    logger.error(f"Continuous translation of utterance {utterance.index} failed: {e}")
+                    
+    except KeyboardInterrupt:
+        print("\n\n Session interrupted by user")
+    
+    stats = capture.stats()
+    print(f" Captured {stats['captured_seconds']}s of audio, {stats['utterances']} utterance(s)")
+
 def main():
     """Main application function"""
     print(" Speech-to-Speech Translator")
@@ -239,11 +304,22 @@ def main():
         )
         target_lang = get_language_code(target_type)
         
+        # Only Others -> Others sessions use MBART; load it in the background
+        # while the session starts, warming up the chosen pair
+        if MBART_WARMUP_ON_STARTUP and source_type.lower() == "others" and target_type.lower() == "others":
+            start_mbart_warmup([(source_lang, target_lang)])
+        
         # Display configuration summary
         print(f"\n TRANSLATION CONFIGURATION")
         print(f"   Source: {source_lang} ({AFRICAN_LANGUAGES.get(source_lang) or OTHER_LANGUAGES.get(source_lang)}) [{source_type}]")
         print(f"   Target: {target_lang} ({AFRICAN_LANGUAGES.get(target_lang) or OTHER_LANGUAGES.get(target_lang)}) [{target_type}]")
         
+        # Capture mode: one utterance per prompt, or hands-free continuous capture
+        capture_mode = get_user_choice(
+            "Choose capture mode (Single/Continuous)",
+            ["Single", "Continuous"]
+        )
+        
         # Main translation loop
         print(f"\n Starting speech translation session...")
         print(" Tips:")
@@ -251,6 +327,12 @@ def main():
         print("   - Pause between sentences") 
         print("   - Press Ctrl+C to exit")
         
+        if capture_mode.lower() == "continuous":
+            run_continuous_session(source_lang, target_lang, source_type, target_type)
+            print(f"\n Translation session completed")
+            print("Thank you for using Speech-to-Speech Translator!")
+            return
+        
         MAX_ATTEMPTS = 5
         attempt = 0
         
@@ -0,0 +1,178 @@
+"""
+Asyncio API for the speech pipeline: transcribe, translate and synthesize
+
+One event loop can drive many concurrent sessions: Spitch HTTP and SDK
+calls are non-blocking (httpx / spitch.AsyncClient), and the CPU-bound or
+blocking backends (MBART, gTTS) run in worker threads. Each backend has its
+own concurrency limit. Request building, response parsing, routing and
+language maps are shared with the sync functions.
+
+Example:
+    async def handle(audio_bytes):
+        text = await transcribe(audio_bytes, "yo")
+        english = await translate(text, "yo", "en", "African", "African")
+        return await synthesize(english, "en")
+"""
+import os
+import asyncio
+import logging
+import weakref
+import threading
+from Speech_translator import (
+    build_spitch_translate_request, parse_spitch_translate_response, spitch_circuit_breaker,
+    translate_text_with_mbart, translate_text_fallback,
+    SPITCH_CONNECT_TIMEOUT, SPITCH_READ_TIMEOUT
+)
+from translation_cache import lookup_translation, store_translation
+from spitch_client import (
+    spitch_transcribe_async, spitch_generate_speech_async, aclose_spitch_clients,
+    SPITCH_CLIENT_MAX_CONNECTIONS, SPITCH_CLIENT_MAX_KEEPALIVE, SPITCH_CLIENT_KEEPALIVE_EXPIRY
+)
+from audio_encoding import encode_for_stt
+from text_to_speech import google_tts_bytes, SPITCH_LANGUAGE_MAP, SPITCH_TTS_LANGUAGES
+
+logger = logging.getLogger(__name__)
+
+# Maximum in-flight calls per backend (can be overridden from the environment)
+ASYNC_CONCURRENCY_LIMITS = {
+    'spitch': int(os.getenv("ASYNC_SPITCH_CONCURRENCY", "32")),
+    'mbart': int(os.getenv("ASYNC_MBART_CONCURRENCY", "2")),
+    'gtts': int(os.getenv("ASYNC_GTTS_CONCURRENCY", "8")),
+}
+
+# Per-event-loop state: semaphores and the httpx client are bound to a loop
+_loop_state = weakref.WeakKeyDictionary()
+_loop_state_lock = threading.Lock()
+
+
+class _LoopState:
+    def __init__(self):
+        self.semaphores = {
+            backend: asyncio.Semaphore(limit) for backend, limit in ASYNC_CONCURRENCY_LIMITS.items()
+        }
+        self.http_client = None
+
+    def get_http_client(self):
+        if self.http_client is None or self.http_client.is_closed:
+            import httpx
+
+            self.http_client = httpx.AsyncClient(
+                timeout=httpx.Timeout(SPITCH_READ_TIMEOUT, connect=SPITCH_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=SPITCH_CLIENT_MAX_CONNECTIONS,
+                    max_keepalive_connections=SPITCH_CLIENT_MAX_KEEPALIVE,
+                    keepalive_expiry=SPITCH_CLIENT_KEEPALIVE_EXPIRY
+                )
+            )
+        return self.http_client
+
+
+def _state():
+    loop = asyncio.get_running_loop()
+    with _loop_state_lock:
+        state = _loop_state.get(loop)
+        if state is None:
+            state = _loop_state[loop] = _LoopState()
+    return state
+
+
+def _limit(backend):
+    """Semaphore bounding concurrent calls to ``backend`` on the running loop"""
+    return _state().semaphores[backend]
+
+
+async def transcribe(audio, language, api_key=None):
+    """
+    Transcribe speech with Spitch STT
+
+    Args:
+        audio (bytes, memoryview or speech_recognition.AudioData): WAV audio
+        language (str): Spitch language code
+
+    Returns:
+        str: Transcribed text
+    """
+    # Resampling/compression is CPU work (and may run an encoder process)
+    encoded = await asyncio.to_thread(encode_for_stt, audio, "spitch")
+    async with _limit('spitch'):
+        return await spitch_transcribe_async(encoded.upload(), language, api_key=api_key)
+
+
+async def translate_with_spitch(text, source_lang, target_lang):
+    """Async ``translate_text_with_spitch_api`` (shares its cache entries)"""
+    # The cache's SQLite tier does file I/O (and commits on store): keep it off the loop
+    cached = await asyncio.to_thread(lookup_translation, text, source_lang, target_lang, "spitch")
+    if cached is not None:
+        return cached
+
+    url, headers, body = build_spitch_translate_request(text, source_lang, target_lang)
+    logger.info(f"Translating with Spitch API (async): '{text}' from {source_lang} to {target_lang}")
+
+    import httpx
+
+    async def request():
+        async with _limit('spitch'):
+            try:
+                response = await _state().get_http_client().post(url, headers=headers, content=body)
+            except httpx.HTTPError as e:
+                logger.error(f"Request failed: {e}")
+                raise Exception(f"Translation request failed: {str(e)}") from e
+        return parse_spitch_translate_response(response.status_code, response.text)
+
+    translation = await spitch_circuit_breaker("translate").call_async(request)
+    await asyncio.to_thread(store_translation, text, source_lang, target_lang, "spitch", translation)
+    return translation
+
+
+async def translate(text, source_lang, target_lang, source_type="Others", target_type="Others"):
+    """
+    Translate text, routing like ``text_to_speech.translate_text_logic``
+
+    MBART for Others -> Others pairs (in a worker thread), otherwise Spitch
+    with the dictionary fallback when Spitch fails or has no API key.
+    """
+    if source_type.lower() == "others" and target_type.lower() == "others":
+        async with _limit('mbart'):
+            return await asyncio.to_thread(translate_text_with_mbart, text, source_lang, target_lang)
+
+    if os.getenv('SPITCH_API_KEY'):
+        try:
+            return await translate_with_spitch(text, source_lang, target_lang)
+        except Exception as e:
+            logger.warning(f"Spitch translation failed: {e}")
+    logger.info("Using fallback translator")
+    return translate_text_fallback(text, source_lang, target_lang)
+
+
+async def synthesize(text, target_lang, voice='sade', api_key=None):
+    """
+    Convert text to speech and return the audio bytes
+
+    Spitch TTS is tried first for its languages (as in ``text_to_speech``),
+    Google TTS otherwise or when Spitch fails.
+    """
+    if not text or not text.strip():
+        raise ValueError("Empty text provided for TTS")
+
+    if target_lang in SPITCH_TTS_LANGUAGES and (api_key or os.getenv('SPITCH_API_KEY')):
+        spitch_lang = SPITCH_LANGUAGE_MAP.get(target_lang, target_lang)
+        try:
+            async with _limit('spitch'):
+                audio_bytes = await spitch_generate_speech_async(text, spitch_lang, voice=voice, api_key=api_key)
+            if audio_bytes:
+                return audio_bytes
+            logger.error("No audio content received from Spitch")
+        except Exception as e:
+            logger.warning(f"Spitch TTS failed, falling back to Google TTS: {e}")
+
+    async with _limit('gtts'):
+        return await asyncio.to_thread(google_tts_bytes, text, target_lang)
+
+
+async def aclose():
+    """Close the running loop's HTTP connections (call before the loop ends)"""
+    with _loop_state_lock:
+        state = _loop_state.pop(asyncio.get_running_loop(), None)
+    if state is not None and state.http_client is not None:
+        await state.http_client.aclose()
+    await aclose_spitch_clients()
@@ -0,0 +1,126 @@
+"""
+Audio encoding stage for STT uploads
+
+Captured audio is resampled to the backend's preferred rate (16 kHz mono,
+16-bit) and compressed before upload:
+
+  flac  lossless, about half the size of WAV (speech_recognition's bundled
+        encoder, or soundfile as a fallback)
+  opus  lossy Ogg/Opus via soundfile, a further ~10x smaller; only for
+        backends that accept it
+  wav   uncompressed (previous behaviour)
+
+The format is configured per backend; anything that fails to encode falls
+back to the next simpler format, so an upload is never lost to encoding.
+"""
+import io
+import os
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Preferred STT input: 16 kHz mono 16-bit (captures are only ever downsampled)
+STT_TARGET_SAMPLE_RATE = int(os.getenv("STT_TARGET_SAMPLE_RATE", "16000"))
+
+# Upload format per STT backend. Google STT is not listed: speech_recognition
+# already sends it FLAC.
+STT_UPLOAD_FORMATS = {
+    'spitch': os.getenv("SPITCH_STT_UPLOAD_FORMAT", "flac").lower(),
+}
+
+# Opus only supports these sample rates
+_OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+_MIME_TYPES = {'wav': "audio/wav", 'flac': "audio/flac", 'opus': "audio/ogg", 'original': "application/octet-stream"}
+_EXTENSIONS = {'wav': "wav", 'flac': "flac", 'opus': "ogg", 'original': "bin"}
+
+
+class EncodedAudio(namedtuple("EncodedAudio", ["data", "format", "sample_rate", "original_size"])):
+    """Encoded upload payload plus what it replaced"""
+
+    @property
+    def mime_type(self):
+        return _MIME_TYPES[self.format]
+
+    @property
+    def filename(self):
+        return f"audio.{_EXTENSIONS[self.format]}"
+
+    def upload(self):
+        """(filename, bytes, mime type) tuple for multipart SDK uploads"""
+        return self.filename, self.data, self.mime_type
+
+
+def _to_audio_data(audio):
+    """Accept sr.AudioData or WAV/AIFF/FLAC bytes-like and return sr.AudioData"""
+    if hasattr(audio, "get_raw_data"):
+        return audio
+    import speech_recognition as sr
+
+    with sr.AudioFile(io.BytesIO(bytes(audio))) as source:
+        return sr.Recognizer().record(source)
+
+
+def _encode_with_soundfile(audio_data, sample_rate, fmt, subtype):
+    import numpy as np
+    import soundfile as sf
+
+    samples = np.frombuffer(audio_data.get_raw_data(convert_rate=sample_rate, convert_width=2), dtype=np.int16)
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, sample_rate, format=fmt, subtype=subtype)
+    return buffer.getvalue()
+
+
+def _encode(audio_data, sample_rate, fmt):
+    if fmt == "opus":
+        if sample_rate not in _OPUS_SAMPLE_RATES:
+            sample_rate = min(rate for rate in _OPUS_SAMPLE_RATES if rate >= sample_rate)
+        return _encode_with_soundfile(audio_data, sample_rate, "OGG", "OPUS"), sample_rate
+    if fmt == "flac":
+        try:
+            return audio_data.get_flac_data(convert_rate=sample_rate, convert_width=2), sample_rate
+        except OSError:
+            # No usable FLAC encoder binary on this platform
+            return _encode_with_soundfile(audio_data, sample_rate, "FLAC", "PCM_16"), sample_rate
+    return audio_data.get_wav_data(convert_rate=sample_rate, convert_width=2), sample_rate
+
+
+def encode_for_stt(audio, backend="spitch", fmt=None):
+    """
+    Resample and compress captured audio for an STT backend
+
+    Args:
+        audio: ``sr.AudioData`` or WAV bytes/memoryview
+        backend (str): Key in STT_UPLOAD_FORMATS
+        fmt (str): Override the backend's format ('flac', 'opus' or 'wav')
+
+    Returns:
+        EncodedAudio: Payload ready for upload
+    """
+    fmt = (fmt or STT_UPLOAD_FORMATS.get(backend, "wav")).lower()
+    try:
+        audio_data = _to_audio_data(audio)
+    except Exception as e:
+        # Not a container we can decode (e.g. an MP3 upload): send it as is
+        logger.warning(f"Cannot decode audio for re-encoding, uploading it unchanged: {e}")
+        data = bytes(audio)
+        return EncodedAudio(data, "original", None, len(data))
+
+    original_size = len(audio_data.get_raw_data()) + 44  # as a WAV upload
+    sample_rate = min(audio_data.sample_rate, STT_TARGET_SAMPLE_RATE)
+
+    for candidate in (fmt, "flac", "wav"):
+        if candidate not in _MIME_TYPES or candidate == "original":
+            logger.warning(f"Unknown STT upload format '{candidate}', skipping")
+            continue
+        try:
+            data, encoded_rate = _encode(audio_data, sample_rate, candidate)
+        except Exception as e:
+            logger.warning(f"Encoding STT audio as {candidate} failed: {e}")
+            continue
+        logger.info(f"STT upload for {backend}: {candidate} @ {encoded_rate} Hz, "
+                    f"{len(data)} bytes (WAV would be {original_size})")
+        return EncodedAudio(data, candidate, encoded_rate, original_size)
+
+    raise Exception("Could not encode audio for STT upload")
@@ -0,0 +1,151 @@
+"""
+Energy + zero-crossing voice-activity detection for captured audio
+
+Audio is cut into short frames, and each frame is classified in one
+vectorized pass:
+  - voiced speech: frame energy well above the capture's noise floor
+  - unvoiced consonants: moderate energy with a high zero-crossing rate
+The speech mask is then extended by a hangover, so word endings and short
+pauses are kept, and the audio is trimmed to the first/last speech frame.
+Captures with no speech are dropped before any STT call.
+"""
+import os
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# VAD configuration (can be overridden from the environment)
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1").lower() not in ("0", "false", "no")
+VAD_FRAME_MS = float(os.getenv("VAD_FRAME_MS", "20"))
+VAD_MIN_ENERGY_DB = float(os.getenv("VAD_MIN_ENERGY_DB", "-50"))  # absolute floor, dBFS
+VAD_ENERGY_MARGIN_DB = float(os.getenv("VAD_ENERGY_MARGIN_DB", "12"))  # above the noise floor
+VAD_MAX_THRESHOLD_DB = float(os.getenv("VAD_MAX_THRESHOLD_DB", "-35"))  # cap, so all-speech captures pass
+VAD_ZCR_THRESHOLD = float(os.getenv("VAD_ZCR_THRESHOLD", "0.25"))  # crossings per sample
+VAD_HANGOVER_MS = float(os.getenv("VAD_HANGOVER_MS", "200"))
+VAD_MIN_SPEECH_MS = float(os.getenv("VAD_MIN_SPEECH_MS", "100"))
+
+# Running totals for vad_stats()
+_stats = {'utterances': 0, 'dropped': 0, 'bytes_in': 0, 'bytes_out': 0}
+_stats_lock = threading.Lock()
+
+
+def frame_features(samples, sample_rate):
+    """
+    Per-frame energy and zero-crossing rate of 16-bit PCM samples
+
+    Returns:
+        tuple: (energy_db, zcr, frame_length) for the whole frames in
+            ``samples``; energy is in dBFS, zcr in crossings per sample
+    """
+    import numpy as np
+
+    frame_length = max(1, int(sample_rate * VAD_FRAME_MS / 1000))
+    num_frames = len(samples) // frame_length
+    frames = samples[:num_frames * frame_length].astype(np.float32).reshape(num_frames, frame_length) / 32768.0
+
+    rms = np.sqrt(np.mean(frames ** 2, axis=1))
+    energy_db = 20 * np.log10(np.maximum(rms, 1e-10))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_length
+    return energy_db, zcr, frame_length
+
+
+def speech_thresholds(noise_floor):
+    """
+    Voiced/unvoiced energy thresholds (dBFS) for a noise floor estimate
+
+    The cap keeps a capture that is speech from end to end from raising its
+    own threshold.
+    """
+    voiced = min(max(noise_floor + VAD_ENERGY_MARGIN_DB, VAD_MIN_ENERGY_DB), VAD_MAX_THRESHOLD_DB)
+    unvoiced = min(max(noise_floor + VAD_ENERGY_MARGIN_DB / 2, VAD_MIN_ENERGY_DB), VAD_MAX_THRESHOLD_DB)
+    return voiced, unvoiced
+
+
+def detect_speech(samples, sample_rate):
+    """
+    Find the speech region in 16-bit PCM samples
+
+    Args:
+        samples (numpy.ndarray): int16 mono samples
+        sample_rate (int): Sample rate in Hz
+
+    Returns:
+        tuple or None: (start, end) sample indices of the speech region, or
+            None when no speech is detected
+    """
+    import numpy as np
+
+    energy_db, zcr, frame_length = frame_features(samples, sample_rate)
+    if len(energy_db) == 0:
+        return None
+
+    # The quietest frames of the capture estimate the noise floor
+    voiced_threshold, unvoiced_threshold = speech_thresholds(np.percentile(energy_db, 10))
+    voiced = energy_db > voiced_threshold
+    unvoiced = (energy_db > unvoiced_threshold) & (zcr > VAD_ZCR_THRESHOLD)
+    speech = voiced | unvoiced
+
+    min_speech_frames = max(1, int(VAD_MIN_SPEECH_MS / VAD_FRAME_MS))
+    if np.count_nonzero(speech) < min_speech_frames:
+        return None
+
+    # Hangover: keep frames within VAD_HANGOVER_MS of speech on both sides
+    hangover = int(VAD_HANGOVER_MS / VAD_FRAME_MS)
+    if hangover:
+        speech = np.convolve(speech, np.ones(2 * hangover + 1), mode="same") > 0
+
+    speech_frames = np.flatnonzero(speech)
+    start = int(speech_frames[0]) * frame_length
+    end = min(len(samples), (int(speech_frames[-1]) + 1) * frame_length)
+    return start, end
+
+
+def trim_silence(audio_data):
+    """
+    Trim leading/trailing silence from an ``sr.AudioData`` capture
+
+    Returns:
+        sr.AudioData or None: The trimmed capture, the input unchanged when
+            the VAD is disabled or NumPy is missing, or None for silence
+    """
+    if not VAD_ENABLED:
+        return audio_data
+    try:
+        import numpy as np
+    except ImportError:
+        logger.warning("NumPy not available, sending untrimmed audio")
+        return audio_data
+
+    raw = audio_data.get_raw_data()
+    sample_width = audio_data.sample_width
+    samples = np.frombuffer(audio_data.get_raw_data(convert_width=2), dtype=np.int16)
+
+    region = detect_speech(samples, audio_data.sample_rate)
+    with _stats_lock:
+        _stats['utterances'] += 1
+        _stats['bytes_in'] += len(raw)
+
+    if region is None:
+        with _stats_lock:
+            _stats['dropped'] += 1
+        logger.info(f"VAD: no speech in {len(raw)} byte capture, dropped before STT")
+        return None
+
+    start, end = region
+    trimmed = raw[start * sample_width:end * sample_width]
+    with _stats_lock:
+        _stats['bytes_out'] += len(trimmed)
+
+    saved = len(raw) - len(trimmed)
+    logger.info(f"VAD: trimmed {saved} of {len(raw)} bytes ({100 * saved / len(raw):.0f}%) of silence")
+    return type(audio_data)(trimmed, audio_data.sample_rate, sample_width)
+
+
+def vad_stats():
+    """Return totals of processed/dropped captures and bytes saved"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['bytes_saved'] = stats['bytes_in'] - stats['bytes_out']
+    return stats
@@ -0,0 +1,138 @@
+"""
+Compare fp32 and int8 dynamic-quantized MBART on a fixed sentence set
+
+Each mode runs in its own subprocess so peak RSS is measured independently.
+Reports average latency, peak RSS and corpus BLEU against reference
+translations (and of int8 against fp32 output).
+
+Usage:
+    python benchmarks/compare_mbart_quantization.py
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import subprocess
+from collections import Counter
+from _util import peak_rss_mb
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SOURCE_LANG = "en_XX"
+TARGET_LANG = "fr_XX"
+
+# Fixed sentence set with reference French translations
+SENTENCES = [
+    ("Good morning, how are you?", "Bonjour, comment allez-vous ?"),
+    ("Thank you very much for your help.", "Merci beaucoup pour votre aide."),
+    ("Where is the train station?", "Où est la gare ?"),
+    ("I would like a cup of coffee, please.", "Je voudrais une tasse de café, s'il vous plaît."),
+    ("The meeting starts at ten o'clock.", "La réunion commence à dix heures."),
+    ("My name is Ada and I live in Lagos.", "Je m'appelle Ada et j'habite à Lagos."),
+    ("Can you speak more slowly?", "Pouvez-vous parler plus lentement ?"),
+    ("The weather is very hot today.", "Il fait très chaud aujourd'hui."),
+    ("We are going to the market tomorrow.", "Nous allons au marché demain."),
+    ("Please close the door when you leave.", "Veuillez fermer la porte en partant."),
+]
+
+
+def corpus_bleu(hypotheses, references, max_n=4):
+    """Corpus BLEU with whitespace tokenization and add-one smoothing for n > 1"""
+    matches = [0] * max_n
+    totals = [0] * max_n
+    hyp_len = ref_len = 0
+
+    for hyp, ref in zip(hypotheses, references):
+        hyp_tokens = hyp.lower().split()
+        ref_tokens = ref.lower().split()
+        hyp_len += len(hyp_tokens)
+        ref_len += len(ref_tokens)
+        for n in range(1, max_n + 1):
+            hyp_ngrams = Counter(tuple(hyp_tokens[i:i + n]) for i in range(len(hyp_tokens) - n + 1))
+            ref_ngrams = Counter(tuple(ref_tokens[i:i + n]) for i in range(len(ref_tokens) - n + 1))
+            matches[n - 1] += sum((hyp_ngrams & ref_ngrams).values())
+            totals[n - 1] += max(len(hyp_tokens) - n + 1, 0)
+
+    if hyp_len == 0:
+        return 0.0
+
+    log_precision = 0.0
+    for n in range(max_n):
+        smooth = 0 if n == 0 else 1
+        if matches[n] + smooth == 0:
+            return 0.0
+        log_precision += math.log((matches[n] + smooth) / (totals[n] + smooth)) / max_n
+
+    brevity = 1.0 if hyp_len > ref_len else math.exp(1 - ref_len / hyp_len)
+    return 100 * brevity * math.exp(log_precision)
+
+
+def run_mode(quantized):
+    """Load one model variant, translate the sentence set and print JSON stats"""
+    sys.path.insert(0, REPO_ROOT)
+    import Speech_translator
+
+    load_start = time.perf_counter()
+    Speech_translator.load_mbart_model(quantized=quantized)
+    load_time = time.perf_counter() - load_start
+
+    # Warm-up run so the first-call overhead is not counted
+    Speech_translator._translate_text_with_mbart(SENTENCES[0][0], SOURCE_LANG, TARGET_LANG)
+
+    outputs = []
+    latencies = []
+    for source, _ in SENTENCES:
+        start = time.perf_counter()
+        outputs.append(Speech_translator._translate_text_with_mbart(source, SOURCE_LANG, TARGET_LANG))
+        latencies.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        'load_time': load_time,
+        'avg_latency': sum(latencies) / len(latencies),
+        'peak_rss_mb': peak_rss_mb(),
+        'outputs': outputs
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["fp32", "int8"], help="Run a single mode (used internally)")
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode == "int8")
+        return
+
+    env = dict(os.environ, TRANSLATION_CACHE_ENABLED="0")
+    results = {}
+    for mode in ("fp32", "int8"):
+        print(f" Running {mode}...")
+        completed = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode],
+            capture_output=True, text=True, env=env, cwd=REPO_ROOT
+        )
+        if completed.returncode != 0:
+            print(completed.stderr)
+            sys.exit(f" {mode} run failed")
+        results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    references = [reference for _, reference in SENTENCES]
+
+    print("\n MBART fp32 vs int8 dynamic quantization")
+    print("=" * 60)
+    print(f"{'mode':<6} {'load (s)':>10} {'latency (s)':>12} {'peak RSS (MB)':>14} {'BLEU':>7}")
+    for mode, stats in results.items():
+        bleu = corpus_bleu(stats['outputs'], references)
+        print(f"{mode:<6} {stats['load_time']:>10.2f} {stats['avg_latency']:>12.3f} "
+              f"{stats['peak_rss_mb']:>14.0f} {bleu:>7.1f}")
+
+    speedup = results['fp32']['avg_latency'] / results['int8']['avg_latency']
+    agreement = corpus_bleu(results['int8']['outputs'], results['fp32']['outputs'])
+    print(f"\n int8 speedup: {speedup:.2f}x")
+    print(f" int8 BLEU against fp32 output: {agreement:.1f}")
+
+
+if __name__ == "__main__":
+    main()
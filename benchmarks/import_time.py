@@ -0,0 +1,93 @@
+"""
+Measure module import time with ``python -X importtime`` and check a budget
+
+Each module is imported in a fresh interpreter. The script prints the
+cumulative import time per module plus its heaviest dependencies, and exits
+non-zero if any module is over its budget.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 500 Speech_translator app
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Default import budgets in milliseconds. None of these modules should load
+# torch, transformers, pygame, gTTS or spitch at import time.
+IMPORT_BUDGETS_MS = {
+    'Speech_translator': 600,
+    'text_to_speech': 700,
+    'app': 900,
+    'speech_to_text': 900,
+}
+
+
+def measure_import(module):
+    """
+    Import ``module`` in a fresh interpreter with -X importtime
+
+    Returns:
+        tuple: (cumulative time in ms, list of (ms, package) for every import)
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=REPO_ROOT,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    )
+    if completed.returncode != 0:
+        raise Exception(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    imports = []
+    total_ms = None
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, package = line[len("import time:"):].split("|")
+        cumulative_ms = int(cumulative) / 1000
+        imports.append((cumulative_ms, package.rstrip()))
+        if package.strip() == module:
+            total_ms = cumulative_ms
+
+    return total_ms, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", help="Modules to check (default: all budgeted modules)")
+    parser.add_argument("--budget-ms", type=float, help="Budget applied to every module")
+    parser.add_argument("--top", type=int, default=5, help="Number of heaviest imports to show")
+    args = parser.parse_args()
+
+    modules = args.modules or list(IMPORT_BUDGETS_MS)
+    over_budget = []
+
+    print(" Import time check")
+    print("=" * 60)
+
+    for module in modules:
+        budget = args.budget_ms or IMPORT_BUDGETS_MS.get(module, 1000)
+        total_ms, imports = measure_import(module)
+        status = "OK" if total_ms <= budget else "OVER BUDGET"
+        print(f"\n {module}: {total_ms:.0f} ms (budget {budget:.0f} ms) {status}")
+
+        # Heaviest direct dependencies (one nesting level below the module)
+        direct = [(ms, name.strip()) for ms, name in imports
+                  if len(name) - len(name.lstrip()) == 3]
+        for ms, name in sorted(direct, reverse=True)[:args.top]:
+            print(f"    {ms:8.1f} ms  {name}")
+
+        if total_ms > budget:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"\n Over budget: {', '.join(over_budget)}")
+        sys.exit(1)
+    print("\n All modules within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare MBART cold-start time and peak RSS for the two load paths
+
+  pytorch      MBartForConditionalGeneration.from_pretrained (deserializes weights)
+  safetensors  memory-mapped safetensors copy (see convert_mbart_to_safetensors)
+
+Each load runs in a fresh subprocess. Run with --convert the first time to
+create the safetensors copy.
+
+Usage:
+    python benchmarks/mbart_load_benchmark.py --convert --repeat 3
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from _util import peak_rss_mb
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_load(load_format):
+    """Load the model once with the given format and print JSON stats"""
+    sys.path.insert(0, REPO_ROOT)
+    import Speech_translator
+
+    # Import time for torch/transformers is reported separately from the load
+    import_start = time.perf_counter()
+    import torch
+    import transformers
+    import_time = time.perf_counter() - import_start
+
+    Speech_translator.MBART_LOAD_FORMAT = load_format
+    start = time.perf_counter()
+    model, _ = Speech_translator.load_mbart_model()
+    load_time = time.perf_counter() - start
+
+    # Touch one forward pass so lazily mapped pages are actually read
+    with torch.no_grad():
+        model.model.encoder(input_ids=torch.tensor([[0, 100, 2]]))
+    first_forward = time.perf_counter() - start - load_time
+
+    print(json.dumps({
+        'import_time': import_time,
+        'load_time': load_time,
+        'first_forward': first_forward,
+        'peak_rss_mb': peak_rss_mb()
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=["pytorch", "safetensors"], help="Run a single load (used internally)")
+    parser.add_argument("--convert", action="store_true", help="Create the safetensors copy first")
+    parser.add_argument("--repeat", type=int, default=1, help="Loads per format")
+    args = parser.parse_args()
+
+    if args.format:
+        run_load(args.format)
+        return
+
+    sys.path.insert(0, REPO_ROOT)
+    import Speech_translator
+
+    if args.convert:
+        Speech_translator.convert_mbart_to_safetensors()
+
+    env = dict(os.environ, TRANSLATION_CACHE_ENABLED="0", MBART_WARMUP_ON_STARTUP="0")
+
+    print(" MBART cold-start load benchmark")
+    print("=" * 70)
+    print(f"{'format':<12} {'run':>4} {'imports (s)':>12} {'load (s)':>10} {'1st fwd (s)':>12} {'peak RSS (MB)':>14}")
+
+    for load_format in ("pytorch", "safetensors"):
+        for run in range(1, args.repeat + 1):
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--format", load_format],
+                capture_output=True, text=True, env=env, cwd=REPO_ROOT
+            )
+            if completed.returncode != 0:
+                print(completed.stderr[-2000:])
+                sys.exit(f" {load_format} load failed")
+            stats = json.loads(completed.stdout.strip().splitlines()[-1])
+            print(f"{load_format:<12} {run:>4} {stats['import_time']:>12.2f} {stats['load_time']:>10.2f} "
+                  f"{stats['first_forward']:>12.2f} {stats['peak_rss_mb']:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Measure per-request latency of Spitch translation calls with and without
+connection reuse, against a local keep-alive stub server
+
+  bare     requests.post per call (new TCP connection every time)
+  session  translate via the shared pooled session (get_spitch_session)
+
+--latency-ms adds a delay to every new connection's first response to stand
+in for the TCP+TLS handshake a real HTTPS endpoint costs.
+
+Usage:
+    python benchmarks/spitch_http_benchmark.py --requests 200 --latency-ms 20
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StubSpitchHandler(BaseHTTPRequestHandler):
+    """Answers every POST with a fixed translation, keeping the connection open"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connect_latency = 0.0
+
+    def setup(self):
+        super().setup()
+        self._first_request = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self._first_request and self.connect_latency:
+            time.sleep(self.connect_latency)
+        self._first_request = False
+
+        body = json.dumps({"translated_text": "bawo"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(connect_latency):
+    StubSpitchHandler.connect_latency = connect_latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSpitchHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def time_calls(call, count):
+    """Return per-call latencies in milliseconds"""
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        call(i)
+        latencies.append(1000 * (time.perf_counter() - start))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per mode")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated handshake cost per new connection")
+    args = parser.parse_args()
+
+    # The benchmark must hit the stub every time, not the translation cache
+    os.environ["TRANSLATION_CACHE_ENABLED"] = "0"
+    sys.path.insert(0, REPO_ROOT)
+    import requests
+    import Speech_translator
+    logging.getLogger("Speech_translator").setLevel(logging.WARNING)
+
+    server = start_stub_server(args.latency_ms / 1000)
+    Speech_translator.SPITCH_BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+    url = f"{Speech_translator.SPITCH_BASE_URL}/translate"
+
+    def bare(i):
+        payload = json.dumps({"text": f"hello {i}", "source": "en", "target": "yo"}).encode("utf-8")
+        response = requests.post(url, data=payload,
+                                 headers={"Content-Type": "application/json"}, timeout=30)
+        response.json()
+
+    def session(i):
+        Speech_translator._translate_text_with_spitch_api(f"hello {i}", "en", "yo")
+
+    print(" Spitch HTTP connection reuse benchmark")
+    print("=" * 60)
+    print(f"{'mode':<10} {'mean (ms)':>10} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+
+    results = {}
+    for name, call in (("bare", bare), ("session", session)):
+        latencies = sorted(time_calls(call, args.requests))
+        results[name] = statistics.mean(latencies)
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        print(f"{name:<10} {results[name]:>10.2f} {statistics.median(latencies):>10.2f} {p95:>10.2f}")
+
+    print(f"\n Saved per request by connection reuse: {results['bare'] - results['session']:.2f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compare the per-utterance cost of handing captured audio to Spitch STT
+
+  tempfile   previous path: write the WAV to temp_audio.wav, read it back
+  memory     current path: pass the captured buffer (memoryview) directly
+
+Only the hand-off is timed; the upload itself is identical for both paths.
+Utterances are synthetic 16-bit mono WAVs of the given length.
+
+Usage:
+    python benchmarks/stt_audio_path_benchmark.py --seconds 5 --utterances 200
+"""
+import os
+import io
+import sys
+import time
+import wave
+import argparse
+import statistics
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_wav(seconds, sample_rate):
+    """Return WAV bytes of pseudo-random 16-bit mono audio"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(os.urandom(int(seconds * sample_rate) * 2))
+    return buffer.getvalue()
+
+
+def tempfile_path(wav_bytes, work_dir):
+    temp_audio_file = os.path.join(work_dir, "temp_audio.wav")
+    with open(temp_audio_file, "wb") as f:
+        f.write(wav_bytes)
+    with open(temp_audio_file, "rb") as audio_file:
+        content = audio_file.read()
+    os.remove(temp_audio_file)
+    return content, len(wav_bytes)
+
+
+def memory_path(wav_bytes, work_dir):
+    from spitch_client import as_audio_bytes
+    return as_audio_bytes(memoryview(wav_bytes)), 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0, help="Utterance length")
+    parser.add_argument("--sample-rate", type=int, default=16000, help="Capture sample rate")
+    parser.add_argument("--utterances", type=int, default=200, help="Utterances per path")
+    parser.add_argument("--dir", default=REPO_ROOT, help="Directory the temp-file path writes to")
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    import spitch_client  # noqa: F401 -- keep the import out of the timings
+    wav_bytes = make_wav(args.seconds, args.sample_rate)
+
+    print(" STT audio hand-off benchmark")
+    print("=" * 70)
+    print(f" Utterance: {args.seconds:.1f}s, {len(wav_bytes) / 1024:.0f} KiB WAV")
+    print(f"{'path':<10} {'mean (ms)':>10} {'p95 (ms)':>10} {'disk written (KiB/utt)':>24}")
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as work_dir:
+        for name, hand_off in (("tempfile", tempfile_path), ("memory", memory_path)):
+            latencies = []
+            written = 0
+            for _ in range(args.utterances):
+                start = time.perf_counter()
+                content, bytes_written = hand_off(wav_bytes, work_dir)
+                latencies.append(1000 * (time.perf_counter() - start))
+                written += bytes_written
+                assert len(content) == len(wav_bytes)
+            latencies.sort()
+            p95 = latencies[int(0.95 * (len(latencies) - 1))]
+            print(f"{name:<10} {statistics.mean(latencies):>10.3f} {p95:>10.3f} "
+                  f"{written / args.utterances / 1024:>24.0f}")
+
+
+if __name__ == "__main__":
+    main()
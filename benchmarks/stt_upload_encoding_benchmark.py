@@ -0,0 +1,122 @@
+"""
+Compare STT upload encodings over a bandwidth-limited link
+
+For each format (wav, flac, opus) the same capture is encoded with
+encode_for_stt and sent through the shared Spitch client to a local stub
+transcription server. The stub reads request bodies at --uplink-kbps. Payload
+size, encode time and end-to-end latency (encode + upload + response) are
+reported.
+
+Pass --wav to use a real recording; otherwise a synthetic 44.1 kHz capture
+(harmonic tone plus noise) is used.
+
+Usage:
+    python benchmarks/stt_upload_encoding_benchmark.py --uplink-kbps 256 --repeat 5
+"""
+import os
+import sys
+import json
+import time
+import wave
+import logging
+import argparse
+import statistics
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ThrottledSttHandler(BaseHTTPRequestHandler):
+    """Stub /v1/transcriptions endpoint that reads uploads at a fixed rate"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    bytes_per_second = 32 * 1024
+
+    def do_POST(self):
+        remaining = int(self.headers.get("Content-Length", 0))
+        chunk_size = max(1024, self.bytes_per_second // 20)
+        while remaining > 0:
+            chunk = self.rfile.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            time.sleep(len(chunk) / self.bytes_per_second)
+
+        body = json.dumps({"request_id": "bench", "text": "bawo ni"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def synthetic_capture(seconds, sample_rate=44100):
+    """Speech-like test signal as 16-bit mono sr.AudioData"""
+    import numpy as np
+    import speech_recognition as sr
+
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    signal = sum(np.sin(k * phase) / k for k in range(1, 8)) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t) ** 2)
+    signal = signal * 6000 + np.random.randn(len(t)) * 150
+    return sr.AudioData(signal.astype(np.int16).tobytes(), sample_rate, 2)
+
+
+def load_capture(path):
+    import speech_recognition as sr
+
+    with wave.open(path, "rb") as wav:
+        return sr.AudioData(wav.readframes(wav.getnframes()), wav.getframerate(), wav.getsampwidth())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", help="Mono WAV recording to upload")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Length of the synthetic capture")
+    parser.add_argument("--uplink-kbps", type=float, default=256, help="Simulated uplink bandwidth (kbit/s)")
+    parser.add_argument("--repeat", type=int, default=3, help="Uploads per format")
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_ROOT)
+    logging.disable(logging.WARNING)
+    import spitch_client
+    from audio_encoding import encode_for_stt
+
+    ThrottledSttHandler.bytes_per_second = int(args.uplink_kbps * 1000 / 8)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottledSttHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    spitch_client.SPITCH_SDK_BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+
+    audio = load_capture(args.wav) if args.wav else synthetic_capture(args.seconds)
+    wav_size = len(audio.get_wav_data())
+
+    print(" STT upload encoding benchmark")
+    print("=" * 78)
+    print(f" Capture: {len(audio.frame_data) / audio.sample_rate / audio.sample_width:.1f}s @ "
+          f"{audio.sample_rate} Hz ({wav_size / 1024:.0f} KiB as WAV), uplink {args.uplink_kbps:.0f} kbit/s")
+    print(f"{'format':<8} {'rate':>6} {'payload (KiB)':>14} {'vs WAV':>8} {'encode (ms)':>12} {'end-to-end (s)':>15}")
+
+    for fmt in ("wav", "flac", "opus"):
+        encode_times, totals = [], []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            encoded = encode_for_stt(audio, "spitch", fmt=fmt)
+            encode_times.append(time.perf_counter() - start)
+            spitch_client.spitch_transcribe(encoded.upload(), "yo", api_key="sk_benchmark")
+            totals.append(time.perf_counter() - start)
+        print(f"{encoded.format:<8} {encoded.sample_rate:>6} {len(encoded.data) / 1024:>14.1f} "
+              f"{100 * len(encoded.data) / wav_size:>7.0f}% {1000 * statistics.mean(encode_times):>12.1f} "
+              f"{statistics.mean(totals):>15.2f}")
+
+    spitch_client.close_spitch_clients()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
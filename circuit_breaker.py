@@ -0,0 +1,220 @@
+"""
+Per-backend circuit breakers
+
+A breaker starts closed. After ``failure_threshold`` consecutive failures it
+opens, and calls fail fast with CircuitOpenError instead of waiting out
+their timeouts, so callers go straight to their fallback. While open, a
+background thread runs the backend's probe. After a successful probe, or
+once ``recovery_timeout`` has passed, the breaker goes half-open. In that
+state a single trial call decides whether it closes again or re-opens.
+"""
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Breaker configuration (can be overridden from the environment)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv("CIRCUIT_RECOVERY_TIMEOUT", "30"))
+CIRCUIT_PROBE_INTERVAL = float(os.getenv("CIRCUIT_PROBE_INTERVAL", "5"))
+
+# Registry of breakers by backend name
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for one backend
+
+    Args:
+        name (str): Backend name used in logs and errors
+        failure_threshold (int): Consecutive failures that open the circuit
+        recovery_timeout (float): Seconds before an open circuit allows a trial call
+        probe (callable): Optional health check returning True when the
+            backend looks reachable; run in the background while open
+        probe_interval (float): Seconds between background probes
+        excluded (tuple): Exception types that do not count as failures
+            (e.g. invalid input)
+        is_failure (callable): Optional ``is_failure(exception)`` predicate;
+            exceptions it returns False for (e.g. client errors caused by
+            the request itself) pass through without counting as failures
+    """
+
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+                 recovery_timeout=CIRCUIT_RECOVERY_TIMEOUT, probe=None,
+                 probe_interval=CIRCUIT_PROBE_INTERVAL, excluded=(ValueError,), is_failure=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.probe = probe
+        self.probe_interval = probe_interval
+        self.excluded = excluded
+        self.is_failure = is_failure
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._probe_thread = None
+        self._last_error = None
+        self._rejected = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow_request(self):
+        """Return True if a call may go to the backend now"""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info(f"Circuit '{self.name}' closed: backend recovered")
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error) if error is not None else None
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning(f"Circuit '{self.name}' opened after {self._failures} failure(s): {error}")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._start_probe()
+
+    def call(self, func, *args, **kwargs):
+        """Call ``func`` through the breaker (raises CircuitOpenError while open)"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open), failing fast")
+        try:
+            result = func(*args, **kwargs)
+        except self.excluded:
+            self._release_trial()
+            raise
+        except Exception as e:
+            self._record_error(e)
+            raise
+        except BaseException:
+            # Cancelled (CancelledError) or interrupted: says nothing about the backend
+            self._release_trial()
+            raise
+        self.record_success()
+        return result
+
+    async def call_async(self, func, *args, **kwargs):
+        """Await ``func(*args, **kwargs)`` through the breaker"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open), failing fast")
+        try:
+            result = await func(*args, **kwargs)
+        except self.excluded:
+            self._release_trial()
+            raise
+        except Exception as e:
+            self._record_error(e)
+            raise
+        except BaseException:
+            # Cancelled (CancelledError) or interrupted: says nothing about the backend
+            self._release_trial()
+            raise
+        self.record_success()
+        return result
+
+    def stats(self):
+        """Return the breaker state and counters"""
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'rejected_calls': self._rejected,
+                'last_error': self._last_error,
+                'open_for': time.monotonic() - self._opened_at if self._opened_at else 0.0
+            }
+
+    def _record_error(self, error):
+        if self.is_failure is None or self.is_failure(error):
+            self.record_failure(error)
+        else:
+            self._release_trial()
+
+    def _release_trial(self):
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _maybe_half_open(self):
+        # Caller holds self._lock
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._trial_in_flight = False
+
+    def _start_probe(self):
+        # Caller holds self._lock
+        if self.probe is None or (self._probe_thread is not None and self._probe_thread.is_alive()):
+            return
+        self._probe_thread = threading.Thread(target=self._run_probe, name=f"circuit-probe-{self.name}", daemon=True)
+        self._probe_thread.start()
+
+    def _run_probe(self):
+        while True:
+            time.sleep(self.probe_interval)
+            with self._lock:
+                if self._state != OPEN:
+                    return
+            try:
+                healthy = self.probe()
+            except Exception as e:
+                logger.debug(f"Circuit '{self.name}' probe failed: {e}")
+                healthy = False
+            if healthy:
+                with self._lock:
+                    if self._state == OPEN:
+                        logger.info(f"Circuit '{self.name}' half-open: probe succeeded")
+                        self._state = HALF_OPEN
+                        self._trial_in_flight = False
+                return
+
+
+def get_circuit_breaker(name, probe=None, is_failure=None):
+    """Return the process-wide breaker for backend ``name``, creating it on first use"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(name, probe=probe, is_failure=is_failure)
+    return breaker
+
+
+def circuit_breaker_stats():
+    """Return ``stats()`` for every registered breaker"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
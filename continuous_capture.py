@@ -0,0 +1,349 @@
+"""
+Continuous microphone capture with utterance segmentation
+
+A dedicated audio thread reads the microphone without pause and writes the
+samples into a NumPy ring buffer. A segmenter thread follows it, frame by
+frame, using the audio_vad features with an adaptive noise floor:
+
+  - an utterance opens at the first speech frame (plus a short pre-roll)
+  - it closes after SEGMENT_PAUSE_MS without speech, or is split at
+    SEGMENT_MAX_SECONDS
+  - segments with less than SEGMENT_MIN_SPEECH_MS of speech are dropped
+
+Finished utterances go onto a bounded queue as ``sr.AudioData``, so the next
+sentence is recorded while the previous one is still being translated. The
+consumer wraps playback in ``muted()`` so the app does not transcribe its
+own TTS output.
+"""
+import os
+import queue
+import logging
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from audio_vad import frame_features, speech_thresholds, VAD_FRAME_MS, VAD_ZCR_THRESHOLD, VAD_HANGOVER_MS
+
+logger = logging.getLogger(__name__)
+
+# Continuous capture configuration (can be overridden from the environment)
+CAPTURE_BUFFER_SECONDS = float(os.getenv("CAPTURE_BUFFER_SECONDS", "60"))
+CAPTURE_QUEUE_SIZE = int(os.getenv("CAPTURE_QUEUE_SIZE", "8"))
+SEGMENT_PAUSE_MS = float(os.getenv("SEGMENT_PAUSE_MS", "700"))
+SEGMENT_PREROLL_MS = float(os.getenv("SEGMENT_PREROLL_MS", "200"))
+SEGMENT_MIN_SPEECH_MS = float(os.getenv("SEGMENT_MIN_SPEECH_MS", "250"))
+SEGMENT_MAX_SECONDS = float(os.getenv("SEGMENT_MAX_SECONDS", "15"))
+SEGMENT_MUTE_TAIL_MS = float(os.getenv("SEGMENT_MUTE_TAIL_MS", "300"))  # echo decay after playback
+
+# Noise floor tracking: follows drops at once, rises slowly (faster in pauses)
+_NOISE_RISE_SILENCE = 0.02
+_NOISE_RISE_SPEECH = 0.002
+
+# A segmented utterance; start_time/duration are seconds since capture start
+Utterance = namedtuple("Utterance", ["audio", "index", "start_time", "duration"])
+
+
+class RingBuffer:
+    """
+    Fixed-size int16 sample buffer addressed by absolute sample position
+
+    Positions keep counting up from the first write; only the last
+    ``capacity`` samples can be read back.
+    """
+
+    def __init__(self, capacity):
+        import numpy as np
+
+        self.capacity = int(capacity)
+        self._buffer = np.zeros(self.capacity, dtype=np.int16)
+        self._written = 0
+        self._condition = threading.Condition()
+
+    @property
+    def written(self):
+        """Absolute position one past the newest sample"""
+        return self._written
+
+    @property
+    def oldest(self):
+        """Absolute position of the oldest sample still held"""
+        return max(0, self._written - self.capacity)
+
+    def write(self, samples):
+        samples = samples[-self.capacity:]
+        with self._condition:
+            offset = self._written % self.capacity
+            first = min(len(samples), self.capacity - offset)
+            self._buffer[offset:offset + first] = samples[:first]
+            self._buffer[:len(samples) - first] = samples[first:]
+            self._written += len(samples)
+            self._condition.notify_all()
+
+    def read(self, start, end):
+        """Copy samples [start, end); raises ValueError if already overwritten"""
+        import numpy as np
+
+        with self._condition:
+            if start < self.oldest or end > self._written or start > end:
+                raise ValueError(f"Samples {start}-{end} not in buffer ({self.oldest}-{self._written})")
+            offset = start % self.capacity
+            length = end - start
+            if offset + length <= self.capacity:
+                return self._buffer[offset:offset + length].copy()
+            return np.concatenate((self._buffer[offset:], self._buffer[:offset + length - self.capacity]))
+
+    def wait_for(self, position, timeout):
+        """Block until ``position`` samples have been written or timeout"""
+        with self._condition:
+            return self._condition.wait_for(lambda: self._written >= position, timeout=timeout)
+
+
+class ContinuousCapture:
+    """
+    Record from a microphone without pause and queue segmented utterances
+
+    Usage:
+        with ContinuousCapture(sr.Microphone()) as capture:
+            while True:
+                utterance = capture.get(timeout=1.0)
+                if utterance is not None:
+                    handle(utterance.audio)
+    """
+
+    def __init__(self, microphone, queue_size=CAPTURE_QUEUE_SIZE, buffer_seconds=CAPTURE_BUFFER_SECONDS):
+        if microphone.SAMPLE_WIDTH != 2:
+            raise ValueError("Continuous capture needs 16-bit microphone samples")
+
+        self.microphone = microphone
+        self.sample_rate = microphone.SAMPLE_RATE
+        # The buffer must outlive the longest utterance plus the segmenter's lag
+        capacity = max(buffer_seconds, 2 * SEGMENT_MAX_SECONDS) * self.sample_rate
+        self.ring = RingBuffer(capacity)
+        self.utterances = queue.Queue(maxsize=queue_size)
+
+        self._stop = threading.Event()
+        self._threads = []
+        self._error = None
+
+        # Segmenter state (segmenter thread only, apart from the mute intervals)
+        self._cursor = 0
+        self._noise_floor = None
+        self._utterance_start = None
+        self._last_speech_end = 0
+        self._speech_samples = 0
+        self._last_emit_end = 0
+        self._mute_lock = threading.Lock()
+        self._mute_depth = 0
+        self._mute_intervals = []  # [start, end) positions, end None while muted
+
+        self._stats = {'utterances': 0, 'dropped_noise': 0, 'dropped_queue_full': 0, 'overruns': 0}
+
+    def _ms_to_samples(self, ms):
+        return int(self.sample_rate * ms / 1000)
+
+    def start(self):
+        """Start the capture and segmenter threads"""
+        if self._threads:
+            return self
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="audio-capture", daemon=True),
+            threading.Thread(target=self._segment_loop, name="audio-segmenter", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Continuous capture started at {self.sample_rate} Hz "
+                    f"({self.ring.capacity / self.sample_rate:.0f}s ring buffer)")
+        return self
+
+    def stop(self, timeout=2.0):
+        """Stop capturing; an utterance in progress is still queued"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        logger.info(f"Continuous capture stopped: {self.stats()}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def get(self, timeout=None):
+        """
+        Next segmented utterance
+
+        Returns:
+            Utterance or None: None if nothing arrived within ``timeout``
+
+        Raises:
+            Exception: If the microphone stopped with an error and no
+                utterances are left
+        """
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            if self._error is not None:
+                raise Exception(f"Audio capture stopped: {self._error}")
+            return None
+
+    def pending(self):
+        """Number of utterances waiting to be processed"""
+        return self.utterances.qsize()
+
+    @contextmanager
+    def muted(self):
+        """
+        Ignore speech while the app is playing audio
+
+        Recording continues, but frames captured in the block (plus
+        SEGMENT_MUTE_TAIL_MS) never start or extend an utterance.
+        """
+        with self._mute_lock:
+            self._mute_depth += 1
+            if self._mute_depth == 1:
+                self._mute_intervals.append([self.ring.written, None])
+        try:
+            yield
+        finally:
+            with self._mute_lock:
+                self._mute_depth -= 1
+                if self._mute_depth == 0:
+                    self._mute_intervals[-1][1] = self.ring.written + self._ms_to_samples(SEGMENT_MUTE_TAIL_MS)
+
+    def stats(self):
+        """Return counts of queued and dropped utterances and buffer overruns"""
+        stats = dict(self._stats)
+        stats['pending'] = self.pending()
+        stats['captured_seconds'] = round(self.ring.written / self.sample_rate, 1)
+        return stats
+
+    def _capture_loop(self):
+        import numpy as np
+
+        try:
+            with self.microphone as source:
+                while not self._stop.is_set():
+                    data = source.stream.read(source.CHUNK)
+                    self.ring.write(np.frombuffer(data, dtype=np.int16))
+        except Exception as e:
+            logger.error(f"Audio capture failed: {e}")
+            self._error = e
+            self._stop.set()
+
+    def _segment_loop(self):
+        try:
+            self._run_segmenter()
+        except Exception as e:
+            # Surface the failure through get() and stop the capture thread too
+            logger.error(f"Utterance segmentation failed: {e}")
+            self._error = e
+            self._stop.set()
+
+    def _run_segmenter(self):
+        frame_length = max(1, self._ms_to_samples(VAD_FRAME_MS))
+        while True:
+            stopping = self._stop.is_set()
+            if not stopping:
+                self.ring.wait_for(self._cursor + frame_length, timeout=0.1)
+
+            if self._cursor < self.ring.oldest:
+                # Fell a whole buffer behind: drop whatever was in progress
+                self._stats['overruns'] += 1
+                logger.warning("Segmenter fell behind the capture, skipping ahead")
+                self._cursor = self.ring.oldest
+                self._utterance_start = None
+
+            end = self.ring.written
+            if end - self._cursor >= frame_length:
+                self._process(self._cursor, end)
+
+            if stopping:
+                self._close_utterance(self.ring.written)
+                return
+
+    def _is_muted(self, frame_start):
+        with self._mute_lock:
+            while self._mute_intervals and self._mute_intervals[0][1] is not None \
+                    and self._mute_intervals[0][1] <= frame_start:
+                self._mute_intervals.pop(0)
+            return any(start <= frame_start and (stop is None or frame_start < stop)
+                       for start, stop in self._mute_intervals)
+
+    def _process(self, start, end):
+        """Classify whole frames in [start, end) and advance the segmenter"""
+        energy_db, zcr, frame_length = frame_features(self.ring.read(start, end), self.sample_rate)
+        pause = self._ms_to_samples(SEGMENT_PAUSE_MS)
+        hangover = self._ms_to_samples(VAD_HANGOVER_MS)
+        max_length = int(SEGMENT_MAX_SECONDS * self.sample_rate)
+
+        for energy, crossings in zip(energy_db.tolist(), zcr.tolist()):
+            frame_start = self._cursor
+            frame_end = frame_start + frame_length
+            self._cursor = frame_end
+
+            if self._noise_floor is None:
+                self._noise_floor = energy
+            voiced_threshold, unvoiced_threshold = speech_thresholds(self._noise_floor)
+            speech = energy > voiced_threshold or (energy > unvoiced_threshold and crossings > VAD_ZCR_THRESHOLD)
+
+            if energy < self._noise_floor:
+                self._noise_floor = energy
+            else:
+                rise = _NOISE_RISE_SPEECH if speech else _NOISE_RISE_SILENCE
+                self._noise_floor += rise * (energy - self._noise_floor)
+
+            if speech and self._is_muted(frame_start):
+                speech = False
+
+            if self._utterance_start is None:
+                if speech:
+                    self._utterance_start = max(frame_start - self._ms_to_samples(SEGMENT_PREROLL_MS),
+                                                self._last_emit_end, self.ring.oldest)
+                    self._last_speech_end = frame_end
+                    self._speech_samples = frame_length
+                continue
+
+            if speech:
+                self._last_speech_end = frame_end
+                self._speech_samples += frame_length
+
+            if frame_end - self._last_speech_end >= pause:
+                self._close_utterance(min(self._last_speech_end + hangover, frame_end))
+            elif frame_end - self._utterance_start >= max_length:
+                self._close_utterance(frame_end)
+
+    def _close_utterance(self, end):
+        start = self._utterance_start
+        if start is None:
+            return
+        self._utterance_start = None
+        self._last_emit_end = end
+
+        if self._speech_samples < self._ms_to_samples(SEGMENT_MIN_SPEECH_MS):
+            self._stats['dropped_noise'] += 1
+            return
+        try:
+            samples = self.ring.read(max(start, self.ring.oldest), end)
+        except ValueError as e:
+            logger.warning(f"Utterance overwritten before it was queued: {e}")
+            self._stats['overruns'] += 1
+            return
+
+        import speech_recognition as sr
+
+        self._stats['utterances'] += 1
+        utterance = Utterance(sr.AudioData(samples.tobytes(), self.sample_rate, 2), self._stats['utterances'],
+                              start / self.sample_rate, len(samples) / self.sample_rate)
+        try:
+            self.utterances.put_nowait(utterance)
+        except queue.Full:
+            # Never block the segmenter: drop the oldest waiting utterance
+            try:
+                dropped = self.utterances.get_nowait()
+                self._stats['dropped_queue_full'] += 1
+                logger.warning(f"Utterance queue full, dropped utterance {dropped.index}")
+            except queue.Empty:
+                pass
+            self.utterances.put_nowait(utterance)
+        logger.info(f"Utterance {utterance.index}: {utterance.duration:.1f}s at {utterance.start_time:.1f}s")
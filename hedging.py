@@ -0,0 +1,225 @@
+"""
+Hedged translation between Spitch and the local fallback
+
+The primary backend (Spitch) gets a head start equal to a percentile of its
+recent latency. If it has not answered by then, the local backend starts in
+parallel and the first acceptable answer wins. The deadline only bounds the
+wait for the local answer: once the local backend has nothing to offer, the
+primary is waited for up to its own HTTP timeout, and pairs without a phrase
+table are not hedged at all. A primary call that loses the race keeps
+running in the background, so its latency is still recorded and its result
+still lands in the translation cache.
+
+Cache hits are answered before any hedging, and only uncached primary calls
+are timed, so the hedge delay tracks real network latency.
+"""
+import os
+import time
+import logging
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from Speech_translator import translate_text_with_spitch_uncached, translate_text_with_phrase_table
+from translation_cache import lookup_translation, store_translation
+from phrase_table import get_phrase_table
+
+logger = logging.getLogger(__name__)
+
+# Hedging configuration (can be overridden from the environment)
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "1").lower() not in ("0", "false", "no")
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_DEADLINE = float(os.getenv("HEDGE_DEADLINE", "5.0"))
+HEDGE_INITIAL_DELAY = float(os.getenv("HEDGE_INITIAL_DELAY", "1.0"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "10"))
+HEDGE_WINDOW = int(os.getenv("HEDGE_WINDOW", "200"))
+HEDGE_MAX_WORKERS = int(os.getenv("HEDGE_MAX_WORKERS", "16"))
+
+# Result of a hedged call, tagged with the backend that produced it
+HedgedTranslation = namedtuple("HedgedTranslation", ["text", "backend", "latency", "hedged"])
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies"""
+
+    def __init__(self, window=HEDGE_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency):
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, percentile, default=None):
+        """Latency at ``percentile`` (0-100), or ``default`` with too few samples"""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return default
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+_spitch_latency = LatencyTracker()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+    return _executor
+
+
+def _acceptable(future):
+    return future.exception() is None and bool(future.result() and future.result().strip())
+
+
+def _has_phrase_table(source_lang, target_lang):
+    return get_phrase_table(source_lang, target_lang) is not None
+
+
+def hedged_translate(text, source_lang, target_lang, deadline=HEDGE_DEADLINE, percentile=HEDGE_PERCENTILE,
+                     primary=translate_text_with_spitch_uncached, secondary=translate_text_with_phrase_table,
+                     primary_name="spitch", secondary_name="fallback", cache_backend="spitch",
+                     secondary_available=_has_phrase_table):
+    """
+    Translate with ``primary``, hedging to ``secondary`` when it runs slow
+
+    Args:
+        text (str): Text to translate
+        source_lang (str): Source language code
+        target_lang (str): Target language code
+        deadline (float): Seconds to wait for ``secondary``; the primary is
+            only bounded by its own HTTP timeout
+        percentile (float): Percentile of recent primary latency to wait
+            before starting ``secondary``
+        secondary (callable): Returns None (or an empty string) when it has
+            no real translation; that answer never wins the race
+        cache_backend (str): Translation cache backend checked before and
+            filled after the uncached ``primary`` call (None to skip)
+        secondary_available (callable): ``(source_lang, target_lang)`` ->
+            bool; pairs where it returns False are not hedged
+
+    Returns:
+        HedgedTranslation: Translated text tagged with the producing backend
+    """
+    start = time.monotonic()
+
+    def elapsed():
+        return time.monotonic() - start
+
+    cached = lookup_translation(text, source_lang, target_lang, cache_backend) if cache_backend else None
+    if cached is not None:
+        return HedgedTranslation(cached, primary_name, elapsed(), False)
+
+    def call_primary():
+        # Only the uncached call is timed; cache hits would drag the percentile down
+        call_start = time.monotonic()
+        translation = primary(text, source_lang, target_lang)
+        if translation and translation.strip():
+            _spitch_latency.record(time.monotonic() - call_start)
+            if cache_backend:
+                store_translation(text, source_lang, target_lang, cache_backend, translation)
+        return translation
+
+    if not secondary_available(source_lang, target_lang):
+        # Nothing to hedge with: a slow answer beats the placeholder fallback
+        return HedgedTranslation(call_primary(), primary_name, elapsed(), False)
+
+    if not HEDGE_ENABLED:
+        # Sequential mode: primary first, secondary only if it fails
+        try:
+            return HedgedTranslation(call_primary(), primary_name, elapsed(), False)
+        except Exception as e:
+            logger.warning(f"{primary_name} translation failed: {e}")
+            translation = secondary(text, source_lang, target_lang)
+            if not (translation and translation.strip()):
+                raise Exception(f"{primary_name} failed and {secondary_name} has no translation: {e}")
+            return HedgedTranslation(translation.strip(), secondary_name, elapsed(), False)
+
+    executor = _get_executor()
+    primary_future = executor.submit(call_primary)
+
+    hedge_delay = min(_spitch_latency.percentile(percentile, HEDGE_INITIAL_DELAY), deadline)
+    wait([primary_future], timeout=hedge_delay)
+    if primary_future.done():
+        if _acceptable(primary_future):
+            return HedgedTranslation(primary_future.result().strip(), primary_name, elapsed(), False)
+        logger.warning(f"{primary_name} translation failed: {primary_future.exception()}")
+    else:
+        logger.info(f"{primary_name} has not answered after {hedge_delay:.2f}s, hedging with {secondary_name}")
+
+    secondary_future = executor.submit(secondary, text, source_lang, target_lang)
+    names = {primary_future: primary_name, secondary_future: secondary_name}
+    pending = {secondary_future} if primary_future.done() else {primary_future, secondary_future}
+
+    errors = []
+    while pending:
+        # The deadline only applies while the secondary may still answer;
+        # after that the primary is bounded by its own HTTP timeout
+        timeout = max(0, deadline - elapsed()) if secondary_future in pending else None
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            logger.warning(f"{secondary_name} has not answered within {deadline:.1f}s, "
+                           f"waiting for {primary_name} only")
+            pending.discard(secondary_future)
+            continue
+        # Prefer the primary if both finished in the same instant
+        for future in sorted(done, key=lambda f: f is not primary_future):
+            if _acceptable(future):
+                return HedgedTranslation(future.result().strip(), names[future], elapsed(), True)
+            errors.append(f"{names[future]}: {future.exception() or 'no translation'}")
+
+    raise Exception(f"All hedged translation backends failed: {'; '.join(errors)}")
+
+
+def hedge_latency_stats():
+    """Return the current hedge delay and sample count for the primary backend"""
+    return {
+        'samples': len(_spitch_latency._samples),
+        'hedge_delay': _spitch_latency.percentile(HEDGE_PERCENTILE, HEDGE_INITIAL_DELAY),
+        'percentile': HEDGE_PERCENTILE,
+        'deadline': HEDGE_DEADLINE
+    }
+
+
+def test_hedging():
+    """Check that slow primaries still win for pairs with nothing to hedge with"""
+    def slow_primary(text, source_lang, target_lang):
+        time.sleep(0.5)
+        return f"slow {text}"
+
+    def no_translation(text, source_lang, target_lang):
+        return None
+
+    print(" Testing hedged translation")
+    print("=" * 50)
+    results = []
+
+    # No phrase table for en→ha: the slow primary answer must be returned
+    start = time.monotonic()
+    result = hedged_translate("Good morning", "en", "ha", deadline=0.1, primary=slow_primary,
+                              cache_backend=None)
+    ok = result.text == "slow Good morning" and result.backend == "spitch" and not result.hedged
+    results.append(ok)
+    print(f" No phrase table, slow primary: '{result.text}' in {time.monotonic() - start:.2f}s "
+          f"{'OK' if ok else 'FAIL'}")
+
+    # Secondary hedges but has no answer: keep waiting past the deadline
+    result = hedged_translate("Good morning", "en", "ha", deadline=0.1, percentile=0, primary=slow_primary,
+                              secondary=no_translation, cache_backend=None,
+                              secondary_available=lambda source, target: True)
+    ok = result.text == "slow Good morning" and result.backend == "spitch"
+    results.append(ok)
+    print(f" Secondary without answer: '{result.text}' ({result.backend}) {'OK' if ok else 'FAIL'}")
+
+    print(f"\n {sum(results)}/{len(results)} checks passed")
+    return all(results)
+
+
+if __name__ == "__main__":
+    test_hedging()
@@ -0,0 +1,117 @@
+"""
+ONNX Runtime inference engine for the local MBART checkpoint
+
+Exports LOCAL_MBART_PATH to ONNX encoder, decoder and decoder-with-past
+graphs once, then runs beam search through onnxruntime on CPU with KV-cache
+reuse between decoding steps. Select it with MBART_BACKEND=onnx.
+
+Install with: pip install optimum[onnxruntime]
+"""
+import os
+import logging
+from Speech_translator import LOCAL_MBART_PATH
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the exported ONNX graphs
+ONNX_MBART_PATH = os.getenv("ONNX_MBART_PATH", os.path.join(LOCAL_MBART_PATH, "onnx"))
+ONNX_PROVIDER = os.getenv("ONNX_PROVIDER", "CPUExecutionProvider")
+
+
+def export_mbart_to_onnx(model_path=LOCAL_MBART_PATH, output_dir=ONNX_MBART_PATH):
+    """
+    Export the MBART checkpoint to ONNX encoder and decoder-with-past graphs
+
+    Args:
+        model_path (str): Local Hugging Face MBART directory
+        output_dir (str): Directory to write the ONNX graphs to
+
+    Returns:
+        str: The output directory
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError:
+        raise Exception("ONNX export requires optimum. Use: pip install optimum[onnxruntime]")
+
+    logger.info(f"Exporting MBART from {model_path} to ONNX: {output_dir}")
+
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        model_path,
+        export=True,
+        use_cache=True,
+        local_files_only=True
+    )
+    model.save_pretrained(output_dir)
+
+    logger.info("MBART ONNX export complete")
+    return output_dir
+
+
+def load_onnx_mbart_model(output_dir=ONNX_MBART_PATH):
+    """
+    Load the ONNX Runtime MBART model, exporting it on first use
+
+    The returned model exposes the same ``generate`` API as the PyTorch model,
+    so it works with the MBART tokenizer and translation functions unchanged.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    except ImportError:
+        raise Exception("ONNX backend requires optimum. Use: pip install optimum[onnxruntime]")
+
+    if not os.path.exists(os.path.join(output_dir, "encoder_model.onnx")):
+        export_mbart_to_onnx(output_dir=output_dir)
+
+    logger.info(f"Loading ONNX MBART model from {output_dir} ({ONNX_PROVIDER})")
+    return ORTModelForSeq2SeqLM.from_pretrained(
+        output_dir,
+        use_cache=True,
+        provider=ONNX_PROVIDER
+    )
+
+
+def test_onnx_parity():
+    """Compare ONNX Runtime translations against the PyTorch model"""
+    import time
+    from transformers import MBartForConditionalGeneration, MBart50TokenizerFast
+    from Speech_translator import _mbart_generate
+
+    test_cases = [
+        ("Hello, how are you?", "en_XX", "es_XX"),
+        ("Thank you very much", "en_XX", "fr_XX"),
+        ("The meeting starts at ten o'clock.", "en_XX", "de_DE"),
+        ("Where is the train station?", "en_XX", "it_IT")
+    ]
+
+    print(" Testing ONNX Runtime parity with PyTorch")
+    print("=" * 50)
+
+    onnx_model = load_onnx_mbart_model()
+    torch_model = MBartForConditionalGeneration.from_pretrained(LOCAL_MBART_PATH, local_files_only=True)
+    torch_model.eval()
+    tokenizer = MBart50TokenizerFast.from_pretrained(LOCAL_MBART_PATH, local_files_only=True)
+
+    matches = 0
+    for text, source, target in test_cases:
+        start = time.perf_counter()
+        torch_result = _mbart_generate(torch_model, tokenizer, [text], source, target)[0]
+        torch_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        onnx_result = _mbart_generate(onnx_model, tokenizer, [text], source, target)[0]
+        onnx_time = time.perf_counter() - start
+
+        same = torch_result == onnx_result
+        matches += same
+        print(f"\n '{text}' ({source} → {target})")
+        print(f" PyTorch ({torch_time:.2f}s): '{torch_result}'")
+        print(f" ONNX    ({onnx_time:.2f}s): '{onnx_result}'")
+        print(f" Result: {' Match' if same else ' Mismatch'}")
+
+    print(f"\n {matches}/{len(test_cases)} translations identical")
+    return matches == len(test_cases)
+
+
+if __name__ == "__main__":
+    test_onnx_parity()
@@ -0,0 +1,190 @@
+import os
+import time
+import logging
+import threading
+import queue
+from concurrent.futures import Future
+from Speech_translator import translate_batch_with_mbart
+
+logger = logging.getLogger(__name__)
+
+# Scheduler configuration (can be overridden from the environment)
+MBART_BATCH_WINDOW_MS = float(os.getenv("MBART_BATCH_WINDOW_MS", "10"))
+MBART_MAX_BATCH_SIZE = int(os.getenv("MBART_MAX_BATCH_SIZE", "16"))
+
+# Global scheduler instance shared by all callers in the process
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+class MBartBatchScheduler:
+    """
+    Collect concurrent MBART requests into micro-batches
+
+    Requests that arrive within ``window_ms`` of the first queued request (or
+    until ``max_batch_size`` requests are waiting) are translated together
+    with one batched ``generate`` per language pair. Every caller gets its own
+    future that resolves to its own translation.
+    """
+
+    def __init__(self, window_ms=MBART_BATCH_WINDOW_MS, max_batch_size=MBART_MAX_BATCH_SIZE):
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+        self._queue = queue.Queue()
+        self._thread = None
+        self._running = False
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._max_batch_seen = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_batch_size = 0
+
+    def start(self):
+        """Start the background batching thread"""
+        with self._start_lock:
+            # Concurrent first submits must not start two batching threads
+            if self._running:
+                return self
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="mbart-scheduler", daemon=True)
+            self._thread.start()
+        logger.info(f"MBART scheduler started (window={self.window_ms}ms, max_batch={self.max_batch_size})")
+        return self
+
+    def stop(self, timeout=5):
+        """Stop the batching thread after the queued requests are served"""
+        with self._start_lock:
+            if not self._running:
+                return
+            self._running = False
+            self._queue.put(None)
+        self._thread.join(timeout)
+        logger.info("MBART scheduler stopped")
+
+    def submit(self, text, source_lang, target_lang, profile=None):
+        """
+        Queue a translation request (``profile`` as for ``translate_text_with_mbart``)
+
+        Returns:
+            concurrent.futures.Future: Resolves to the translated text
+        """
+        if not self._running:
+            self.start()
+        future = Future()
+        self._queue.put((text, source_lang, target_lang, profile, future, time.monotonic()))
+        return future
+
+    def translate(self, text, source_lang, target_lang, profile=None, timeout=None):
+        """Queue a translation request and block until it is done"""
+        return self.submit(text, source_lang, target_lang, profile).result(timeout)
+
+    def stats(self):
+        """Return queue depth, batch size and wait time counters"""
+        with self._stats_lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'batches': self._batches,
+                'requests': self._requests,
+                'last_batch_size': self._last_batch_size,
+                'max_batch_size': self._max_batch_seen,
+                'avg_batch_size': self._requests / self._batches if self._batches else 0.0,
+                'avg_wait_ms': 1000 * self._total_wait / self._requests if self._requests else 0.0,
+                'max_wait_ms': 1000 * self._max_wait
+            }
+
+    def _collect_batch(self):
+        """Block for the first request, then gather more until the window closes"""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.window_ms / 1000.0
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Serve what we have, then let the run loop see the stop marker
+                self._queue.put(None)
+                break
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                break
+            self._process(batch)
+
+    def _process(self, batch):
+        started = time.monotonic()
+        waits = [started - enqueued for _, _, _, _, _, enqueued in batch]
+
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._last_batch_size = len(batch)
+            self._max_batch_seen = max(self._max_batch_seen, len(batch))
+            self._total_wait += sum(waits)
+            self._max_wait = max(self._max_wait, max(waits))
+
+        # Group by language pair and profile so each group is a single batched generate
+        groups = {}
+        for item in batch:
+            groups.setdefault((item[1], item[2], item[3]), []).append(item)
+
+        for (src, tgt, profile), items in groups.items():
+            try:
+                translations = translate_batch_with_mbart(
+                    [text for text, _, _, _, _, _ in items], src, tgt,
+                    batch_size=self.max_batch_size,
+                    profile=profile
+                )
+                for (_, _, _, _, future, _), translation in zip(items, translations):
+                    future.set_result(translation)
+            except Exception as e:
+                if len(items) == 1:
+                    logger.error(f"MBART scheduler batch failed for {src} -> {tgt}: {e}")
+                    items[0][4].set_exception(e)
+                    continue
+                # Retry one by one so a single bad input only fails its own request
+                logger.warning(f"MBART scheduler batch failed for {src} -> {tgt}, retrying items singly: {e}")
+                for text, _, _, _, future, _ in items:
+                    try:
+                        future.set_result(translate_batch_with_mbart([text], src, tgt, profile=profile)[0])
+                    except Exception as item_error:
+                        logger.error(f"MBART scheduler request failed for {src} -> {tgt}: {item_error}")
+                        future.set_exception(item_error)
+
+        logger.debug(f"MBART scheduler served batch of {len(batch)} in {time.monotonic() - started:.3f}s")
+
+
+def get_mbart_scheduler():
+    """Return the process-wide MBART scheduler, starting it on first use"""
+    global _scheduler
+
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = MBartBatchScheduler().start()
+    return _scheduler
+
+
+def translate_text_with_mbart_scheduled(text, source_lang, target_lang, profile=None, timeout=None):
+    """
+    Translate text through the shared MBART micro-batching scheduler
+
+    Drop-in alternative to ``translate_text_with_mbart`` for concurrent callers.
+    """
+    if not text or not text.strip():
+        raise ValueError("Input text is empty")
+    return get_mbart_scheduler().translate(text, source_lang, target_lang, profile, timeout)
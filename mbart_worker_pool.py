@@ -0,0 +1,316 @@
+"""
+Multi-process MBART worker pool
+
+The parent loads the model once and starts N worker processes that share
+its weights: copy-on-write via fork where available, otherwise through
+torch shared memory. Each worker pins its own torch thread count and serves
+translation jobs from its own request queue.
+
+Start the pool before running any inference in the parent process (set
+MBART_WARMUP_ON_STARTUP=0): forking after OpenMP thread pools have been used
+can hang the children. Only the PyTorch backend is supported.
+
+The parent records which worker each job was sent to, and workers report
+each job they start. When a worker dies (crash, OOM kill) it is replaced:
+the job it was running fails, and jobs it had not started are sent to the
+replacement, so no future waits forever. A worker serves its queue in order,
+so only its oldest unreported job can have been taken without a claim; that
+one is retried once.
+"""
+import os
+import math
+import queue
+import logging
+import threading
+import itertools
+from concurrent.futures import Future
+import Speech_translator
+from Speech_translator import load_mbart_model, translate_batch_with_mbart
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration (can be overridden from the environment)
+_CPU_COUNT = os.cpu_count() or 1
+MBART_POOL_WORKERS = int(os.getenv("MBART_POOL_WORKERS", str(max(1, _CPU_COUNT // 2))))
+MBART_POOL_THREADS_PER_WORKER = int(os.getenv(
+    "MBART_POOL_THREADS_PER_WORKER",
+    str(max(1, _CPU_COUNT // MBART_POOL_WORKERS))
+))
+# Seconds between worker liveness checks
+MBART_POOL_HEALTH_INTERVAL = float(os.getenv("MBART_POOL_HEALTH_INTERVAL", "1.0"))
+
+# Global pool instance shared by all callers in the process
+_worker_pool = None
+_worker_pool_lock = threading.Lock()
+
+
+def _worker_main(model, tokenizer, num_threads, requests, results):
+    """Worker process loop: serve translation jobs until a None job arrives"""
+    import torch
+    import translation_cache
+
+    torch.set_num_threads(num_threads)
+
+    # Use the parent's (shared) model instead of loading another copy
+    Speech_translator._mbart_model = model
+    Speech_translator._mbart_tokenizer = tokenizer
+    Speech_translator._mbart_ready.set()
+
+    # SQLite connections must not cross a fork; open a fresh cache per worker
+    translation_cache._translation_cache = None
+
+    while True:
+        job = requests.get()
+        if job is None:
+            break
+        job_id, texts, source_lang, target_lang, profile = job
+        # Tells the parent this job was started, not just queued, if the process dies
+        results.put(("claim", job_id))
+        try:
+            translations = translate_batch_with_mbart(texts, source_lang, target_lang, profile=profile)
+            results.put(("done", job_id, translations, None))
+        except Exception as e:
+            results.put(("done", job_id, None, str(e)))
+
+
+class MBartWorkerPool:
+    """
+    Pool of worker processes running MBART on shared weights
+
+    Each job is sent to the worker with the fewest outstanding jobs over that
+    worker's own request queue, and results are matched back to per-job
+    futures.
+    """
+
+    def __init__(self, num_workers=MBART_POOL_WORKERS, threads_per_worker=MBART_POOL_THREADS_PER_WORKER):
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self._processes = []
+        self._requests = []  # per-worker request queues
+        self._results = None
+        self._collector = None
+        self._pending = {}
+        self._jobs = {}  # job_id -> job tuple, kept until its result arrives
+        self._assigned = {}  # job_id -> index of the worker it was sent to
+        self._claimed = set()  # jobs a worker has started
+        self._retried = set()  # jobs retried after a worker died without claiming them
+        self._load = []  # outstanding jobs per worker
+        self._pending_lock = threading.Lock()
+        self._model = None
+        self._tokenizer = None
+        self._context = None
+        self._stopping = False
+        self.restarts = 0
+        self._job_ids = itertools.count()
+        self.start_method = None
+
+    def start(self):
+        """Load the model in the parent and start the worker processes"""
+        if self._processes:
+            return self
+
+        import torch.multiprocessing as mp
+
+        model, tokenizer = load_mbart_model()
+        model.eval()
+
+        # Forked children would otherwise disable tokenizer parallelism with a warning
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+        self.start_method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+        if self.start_method != "fork":
+            # Without fork, workers receive the weights through shared memory
+            model.share_memory()
+
+        self._model, self._tokenizer = model, tokenizer
+        self._context = mp.get_context(self.start_method)
+        self._results = self._context.Queue()
+        self._stopping = False
+
+        self._requests = [self._context.Queue() for _ in range(self.num_workers)]
+        self._load = [0] * self.num_workers
+        self._processes = [self._start_worker(index) for index in range(self.num_workers)]
+
+        self._collector = threading.Thread(target=self._collect_results, name="mbart-pool-results", daemon=True)
+        self._collector.start()
+
+        logger.info(f"MBART worker pool started: {self.num_workers} workers x "
+                    f"{self.threads_per_worker} threads ({self.start_method})")
+        return self
+
+    def _start_worker(self, index):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(self._model, self._tokenizer, self.threads_per_worker, self._requests[index], self._results),
+            name=f"mbart-worker-{index}",
+            daemon=True
+        )
+        process.start()
+        return process
+
+    def stop(self, timeout=10):
+        """Stop the workers after the queued jobs are served"""
+        if not self._processes:
+            return
+        self._stopping = True
+        for requests in self._requests:
+            requests.put(None)
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._results.put(None)
+        self._collector.join(timeout)
+
+        with self._pending_lock:
+            for future in self._pending.values():
+                future.set_exception(Exception("MBART worker pool stopped"))
+            self._pending.clear()
+            self._jobs.clear()
+            self._assigned.clear()
+            self._claimed.clear()
+            self._retried.clear()
+        logger.info("MBART worker pool stopped")
+
+    def submit(self, texts, source_lang, target_lang, profile=None):
+        """
+        Queue a batch of texts for one worker
+
+        Returns:
+            concurrent.futures.Future: Resolves to the list of translations
+        """
+        if not self._processes:
+            self.start()
+        job_id = next(self._job_ids)
+        future = Future()
+        job = (job_id, list(texts), source_lang, target_lang, profile)
+        with self._pending_lock:
+            # Queued under the lock so a worker restart cannot swap the queue in between
+            index = min(range(len(self._processes)), key=self._load.__getitem__)
+            self._pending[job_id] = future
+            self._jobs[job_id] = job
+            self._assigned[job_id] = index
+            self._load[index] += 1
+            self._requests[index].put(job)
+        return future
+
+    def translate(self, text, source_lang, target_lang, profile=None, timeout=None):
+        """Translate a single text on the least busy worker"""
+        return self.submit([text], source_lang, target_lang, profile).result(timeout)[0]
+
+    def translate_batch(self, texts, source_lang, target_lang, profile=None, timeout=None):
+        """Split a batch across the workers and return translations in input order"""
+        texts = list(texts)
+        if not texts:
+            return []
+        chunk_size = math.ceil(len(texts) / self.num_workers)
+        futures = [
+            self.submit(texts[start:start + chunk_size], source_lang, target_lang, profile)
+            for start in range(0, len(texts), chunk_size)
+        ]
+        results = []
+        for future in futures:
+            results.extend(future.result(timeout))
+        return results
+
+    def _collect_results(self):
+        while True:
+            try:
+                item = self._results.get(timeout=MBART_POOL_HEALTH_INTERVAL)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if item is None:
+                break
+            self._handle_result(item)
+            self._check_workers()
+
+    def _handle_result(self, item):
+        if item[0] == "claim":
+            with self._pending_lock:
+                if item[1] in self._pending:
+                    self._claimed.add(item[1])
+            return
+
+        _, job_id, translations, error = item
+        with self._pending_lock:
+            future = self._pending.pop(job_id, None)
+            self._forget(job_id)
+        if future is None:
+            return
+        if error is not None:
+            future.set_exception(Exception(f"MBART worker translation failed: {error}"))
+        else:
+            future.set_result(translations)
+
+    def _forget(self, job_id):
+        # Caller holds self._pending_lock
+        self._jobs.pop(job_id, None)
+        self._claimed.discard(job_id)
+        self._retried.discard(job_id)
+        index = self._assigned.pop(job_id, None)
+        if index is not None:
+            self._load[index] -= 1
+
+    def _drain_results(self):
+        """Handle results already sent, so claims from a dead worker are seen"""
+        while True:
+            try:
+                item = self._results.get_nowait()
+            except queue.Empty:
+                return
+            if item is None:
+                # Stop sentinel: leave it for the collector loop
+                self._results.put(None)
+                return
+            self._handle_result(item)
+
+    def _check_workers(self):
+        """Replace dead workers, failing the job each one was running"""
+        for index, process in enumerate(self._processes):
+            if self._stopping:
+                return
+            if process.is_alive():
+                continue
+            logger.error(f"MBART worker {index} (pid {process.pid}) died with exit code {process.exitcode}, restarting it")
+            self._drain_results()
+            with self._pending_lock:
+                self._requests[index] = self._context.Queue()
+                self._processes[index] = self._start_worker(index)
+                jobs = sorted(job_id for job_id, assigned in self._assigned.items() if assigned == index)
+                unclaimed = [job_id for job_id in jobs if job_id not in self._claimed]
+                # The oldest unclaimed job may have been taken just before the crash
+                suspect = unclaimed[0] if unclaimed else None
+                for job_id in jobs:
+                    if job_id in self._claimed or (job_id == suspect and job_id in self._retried):
+                        future = self._pending.pop(job_id, None)
+                        self._forget(job_id)
+                        if future is not None:
+                            future.set_exception(Exception("MBART worker died during translation"))
+                        continue
+                    if job_id == suspect:
+                        self._retried.add(job_id)
+                    self._requests[index].put(self._jobs[job_id])
+            self.restarts += 1
+
+
+def get_mbart_worker_pool():
+    """Return the process-wide MBART worker pool, starting it on first use"""
+    global _worker_pool
+
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = MBartWorkerPool().start()
+    return _worker_pool
+
+
+def translate_text_with_mbart_pool(text, source_lang, target_lang, profile=None, timeout=None):
+    """
+    Translate text on the shared MBART worker pool
+
+    Drop-in alternative to ``translate_text_with_mbart`` for multi-core hosts.
+    """
+    if not text or not text.strip():
+        raise ValueError("Input text is empty")
+    return get_mbart_worker_pool().translate(text, source_lang, target_lang, profile, timeout)
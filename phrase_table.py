@@ -0,0 +1,169 @@
+"""
+Phrase-table engine for the dictionary fallback translator
+
+Phrase tables live in PHRASE_TABLE_DIR as ``<src>_<tgt>.tsv`` files with one
+``source phrase<TAB>translation`` pair per line (``#`` starts a comment).
+Each table is compiled once into a word-level trie and applied with a
+greedy longest-match pass, so multi-word phrases such as "good morning" win
+over their individual words.
+"""
+import os
+import re
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+PHRASE_TABLE_DIR = os.getenv(
+    "PHRASE_TABLE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "phrase_tables")
+)
+
+# Punctuation kept around words but ignored for lookups
+PUNCTUATION = '.,!?;:"\'()¿¡«»…'
+
+_TOKEN_PATTERN = re.compile(r'\S+')
+
+# Compiled tables per language pair (None when the pair has no table)
+_phrase_tables = {}
+_phrase_tables_lock = threading.Lock()
+
+
+class PhraseTable:
+    """
+    Word-level trie of source phrases with greedy longest-match lookup
+
+    Lookups cost O(words in the text x longest phrase length) regardless of
+    how many entries the table holds.
+    """
+
+    _END = None  # trie key holding the translation of a complete phrase
+
+    def __init__(self, entries=()):
+        self._root = {}
+        self.size = 0
+        self.max_phrase_words = 0
+        for source, target in entries:
+            self.add(source, target)
+
+    def add(self, source, target):
+        """Add a phrase; later entries for the same phrase replace earlier ones"""
+        words = source.lower().split()
+        if not words:
+            return
+        node = self._root
+        for word in words:
+            node = node.setdefault(word, {})
+        if self._END not in node:
+            self.size += 1
+        node[self._END] = target
+        self.max_phrase_words = max(self.max_phrase_words, len(words))
+
+    @classmethod
+    def from_tsv(cls, path):
+        """Compile a table from a TSV file"""
+        table = cls()
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.rstrip("\n")
+                if not line.strip() or line.lstrip().startswith("#"):
+                    continue
+                parts = line.split("\t")
+                if len(parts) != 2:
+                    logger.warning(f"Skipping malformed phrase table line {path}:{line_number}")
+                    continue
+                table.add(parts[0].strip(), parts[1].strip())
+        return table
+
+    def translate(self, text):
+        """
+        Translate text in one pass, longest phrase first
+
+        Unknown words are passed through (lower-cased), and punctuation around
+        words is preserved. A phrase never spans punctuation: only its last
+        word may carry trailing punctuation.
+        """
+        return self._translate(text)[0]
+
+    def lookup(self, text):
+        """Translate text, or return None when no phrase in it is in the table"""
+        translation, matches = self._translate(text)
+        return translation if matches else None
+
+    def _translate(self, text):
+        tokens = []
+        for raw in _TOKEN_PATTERN.findall(text.lower()):
+            word = raw.strip(PUNCTUATION)
+            if not word:
+                tokens.append((raw, "", ""))
+                continue
+            start = len(raw) - len(raw.lstrip(PUNCTUATION))
+            tokens.append((word, raw[:start], raw[start + len(word):]))
+
+        output = []
+        matches = 0
+        position = 0
+        while position < len(tokens):
+            match_end, translation = self._longest_match(tokens, position)
+            if match_end is None:
+                word, leading, trailing = tokens[position]
+                output.append(leading + word + trailing)
+                position += 1
+                continue
+            output.append(tokens[position][1] + translation + tokens[match_end - 1][2])
+            matches += 1
+            position = match_end
+
+        return ' '.join(output), matches
+
+    def translate_batch(self, texts):
+        """Translate a list of texts, preserving order"""
+        return [self.translate(text) for text in texts]
+
+    def _longest_match(self, tokens, position):
+        node = self._root
+        match_end, translation = None, None
+        for index in range(position, len(tokens)):
+            word, leading, trailing = tokens[index]
+            if index > position and leading:
+                break
+            node = node.get(word)
+            if node is None:
+                break
+            if self._END in node:
+                match_end, translation = index + 1, node[self._END]
+            if trailing:
+                break
+        return match_end, translation
+
+
+def get_phrase_table(source_lang, target_lang):
+    """
+    Return the compiled phrase table for a language pair (loaded once)
+
+    Args:
+        source_lang (str): Short source language code (e.g., 'en')
+        target_lang (str): Short target language code (e.g., 'yo')
+
+    Returns:
+        PhraseTable or None: None when there is no table for the pair
+    """
+    key = f"{source_lang}_{target_lang}"
+    if key in _phrase_tables:
+        return _phrase_tables[key]
+
+    with _phrase_tables_lock:
+        if key not in _phrase_tables:
+            path = os.path.join(PHRASE_TABLE_DIR, f"{key}.tsv")
+            table = None
+            if os.path.exists(path):
+                table = PhraseTable.from_tsv(path)
+                logger.info(f"Loaded phrase table {key}: {table.size} entries")
+            _phrase_tables[key] = table
+    return _phrase_tables[key]
+
+
+def clear_phrase_tables():
+    """Drop compiled tables so edited TSV files are reloaded on next use"""
+    with _phrase_tables_lock:
+        _phrase_tables.clear()
@@ -0,0 +1,187 @@
+"""
+Target-language vocabulary pruning for MBART
+
+Builds a reduced vocabulary from the configured language codes and a corpus
+sample, slices the shared embedding / LM-head matrices and final logits bias
+to match, and saves a smaller checkpoint plus the token-id mapping. Point
+PRUNED_MBART_PATH at the output directory to have load_mbart_model use it.
+
+Usage:
+    python prune_mbart_vocab.py corpus_en.txt corpus_fr.txt --output pruned_mbart
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+from collections import Counter
+from Speech_translator import LOCAL_MBART_PATH
+
+logger = logging.getLogger(__name__)
+
+# File holding the kept token ids (new id -> original id) next to the checkpoint
+VOCAB_MAP_FILE = "vocab_map.json"
+
+
+class PrunedVocabTokenizer:
+    """
+    Token-id remapping layer around the MBART tokenizer
+
+    Encoding maps original token ids to the pruned model's ids (tokens that
+    were pruned become <unk>), decoding maps them back. Special tokens keep
+    their ids, and every other attribute is passed through unchanged.
+    """
+
+    def __init__(self, tokenizer, kept_token_ids):
+        self._tokenizer = tokenizer
+        self.new_to_old = list(kept_token_ids)
+        self.old_to_new = {old: new for new, old in enumerate(self.new_to_old)}
+        self.unk_id = self.old_to_new[tokenizer.unk_token_id]
+        self.lang_code_to_id = {
+            code: self.old_to_new[token_id]
+            for code, token_id in tokenizer.lang_code_to_id.items()
+            if token_id in self.old_to_new
+        }
+
+    def __getattr__(self, name):
+        return getattr(self._tokenizer, name)
+
+    def __call__(self, *args, **kwargs):
+        if kwargs.get("return_tensors"):
+            raise ValueError("PrunedVocabTokenizer returns id lists; build tensors from them")
+        encoded = self._tokenizer(*args, **kwargs)
+        encoded["input_ids"] = self._map(encoded["input_ids"], self.old_to_new, self.unk_id)
+        return encoded
+
+    def decode(self, token_ids, **kwargs):
+        return self._tokenizer.decode(self._to_old(token_ids), **kwargs)
+
+    def batch_decode(self, sequences, **kwargs):
+        return [self.decode(sequence, **kwargs) for sequence in sequences]
+
+    def _to_old(self, token_ids):
+        if hasattr(token_ids, "tolist"):
+            token_ids = token_ids.tolist()
+        if isinstance(token_ids, int):
+            return self.new_to_old[token_ids]
+        return [self.new_to_old[token_id] for token_id in token_ids]
+
+    def _map(self, ids, mapping, default):
+        if ids and isinstance(ids[0], list):
+            return [self._map(row, mapping, default) for row in ids]
+        return [mapping.get(token_id, default) for token_id in ids]
+
+
+def build_pruned_vocab(tokenizer, corpus_texts, language_codes, min_count=1):
+    """
+    Choose the token ids to keep
+
+    Args:
+        tokenizer: The full MBART-50 tokenizer
+        corpus_texts (iterable): Sample sentences in the supported languages
+        language_codes (list): MBART language codes to keep (e.g., 'fr_XX');
+            the other language-code tokens are pruned
+        min_count (int): Minimum corpus frequency for a token to be kept
+
+    Returns:
+        list: Sorted original token ids; the position is the new id
+    """
+    counts = Counter()
+    for text in corpus_texts:
+        counts.update(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    # all_special_ids includes every MBART-50 language code; keep only the configured ones
+    keep = set(tokenizer.all_special_ids) - set(tokenizer.lang_code_to_id.values())
+    keep.update(range(4))  # <s>, <pad>, </s>, <unk> keep their ids
+    for code in language_codes:
+        if code in tokenizer.lang_code_to_id:
+            keep.add(tokenizer.lang_code_to_id[code])
+        else:
+            logger.warning(f"Language {code} is not in the MBART-50 vocabulary, skipping")
+    keep.update(token_id for token_id, count in counts.items() if count >= min_count)
+
+    return sorted(keep)
+
+
+def prune_mbart_model(model, kept_token_ids):
+    """Slice the shared embedding, tied LM head and final logits bias in place"""
+    import torch
+
+    index = torch.tensor(kept_token_ids, dtype=torch.long)
+    new_size = len(kept_token_ids)
+
+    with torch.no_grad():
+        # Move kept rows to the front; resize_token_embeddings then truncates
+        # the (tied) embedding/LM head and final_logits_bias to new_size
+        embeddings = model.get_input_embeddings().weight
+        embeddings[:new_size] = embeddings[index].clone()
+        model.final_logits_bias[:, :new_size] = model.final_logits_bias[:, index].clone()
+        output_embeddings = model.get_output_embeddings().weight
+        if output_embeddings.data_ptr() != embeddings.data_ptr():
+            output_embeddings[:new_size] = output_embeddings[index].clone()
+
+    model.resize_token_embeddings(new_size)
+    return model
+
+
+def load_pruned_mbart(model_dir):
+    """
+    Load a pruned checkpoint with its token-id remapping tokenizer
+
+    Returns:
+        tuple: (model, PrunedVocabTokenizer)
+    """
+    from transformers import MBartForConditionalGeneration, MBart50TokenizerFast
+
+    with open(os.path.join(model_dir, VOCAB_MAP_FILE), encoding="utf-8") as f:
+        kept_token_ids = json.load(f)["kept_token_ids"]
+
+    logger.info(f"Loading pruned MBART ({len(kept_token_ids)} tokens) from {model_dir}")
+    model = MBartForConditionalGeneration.from_pretrained(model_dir, local_files_only=True)
+    model.eval()
+    tokenizer = MBart50TokenizerFast.from_pretrained(model_dir, local_files_only=True)
+    return model, PrunedVocabTokenizer(tokenizer, kept_token_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="+", help="Text files with sample sentences, one per line")
+    parser.add_argument("--output", required=True, help="Directory for the pruned checkpoint")
+    parser.add_argument("--languages", nargs="*", help="MBART language codes (default: OTHER_LANGUAGES)")
+    parser.add_argument("--min-count", type=int, default=1, help="Minimum token frequency to keep")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    from transformers import MBartForConditionalGeneration, MBart50TokenizerFast
+
+    language_codes = args.languages
+    if not language_codes:
+        from speech_to_text import OTHER_LANGUAGES
+        language_codes = list(OTHER_LANGUAGES)
+
+    tokenizer = MBart50TokenizerFast.from_pretrained(LOCAL_MBART_PATH, local_files_only=True)
+    model = MBartForConditionalGeneration.from_pretrained(LOCAL_MBART_PATH, local_files_only=True)
+
+    corpus_texts = []
+    for path in args.corpus:
+        with open(path, encoding="utf-8") as f:
+            corpus_texts.extend(line.strip() for line in f if line.strip())
+
+    kept_token_ids = build_pruned_vocab(tokenizer, corpus_texts, language_codes, args.min_count)
+    original_size = model.get_input_embeddings().weight.shape[0]
+    print(f" Keeping {len(kept_token_ids)} of {original_size} tokens "
+          f"({100 * len(kept_token_ids) / original_size:.1f}%) from {len(corpus_texts)} sentences")
+
+    prune_mbart_model(model, kept_token_ids)
+    model.save_pretrained(args.output)
+    tokenizer.save_pretrained(args.output)
+    with open(os.path.join(args.output, VOCAB_MAP_FILE), "w", encoding="utf-8") as f:
+        json.dump({"kept_token_ids": kept_token_ids, "languages": language_codes}, f)
+
+    print(f" Pruned checkpoint saved to {args.output}")
+    print(f" Use it with: PRUNED_MBART_PATH={args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,14 @@
 import speech_recognition as sr
-from Speech_translator import translate_text_with_mbart, translate_text_with_spitch, translate_text_fallback
+from Speech_translator import stream_translate_with_mbart, translate_text_fallback, start_mbart_warmup, MBART_WARMUP_ON_STARTUP
 from text_to_speech import speak_text
+from hedging import hedged_translate
+from audio_vad import trim_silence
+from continuous_capture import ContinuousCapture
+from audio_encoding import encode_for_stt
 import logging
 from dotenv import load_dotenv
 import os
 import sys
-from spitch import Client
 import tempfile
 import io
 
@@ -23,9 +26,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize speech recognition
+# Initialize speech recognition (the microphone is opened on first use)
 recognizer = sr.Recognizer()
-mic = sr.Microphone()
+mic = None
+
+def get_microphone():
+    """Create the shared microphone on first use"""
+    global mic
+    if mic is None:
+        mic = sr.Microphone()
+    return mic
 
 # Language options for African languages (Spitch)
 AFRICAN_LANGUAGES = {
@@ -161,7 +171,7 @@ def setup_microphone():
             print(f"  {i}: {name}")
         
         # Calibrate microphone
-        with mic as source:
+        with get_microphone() as source:
             print(" Calibrating microphone for ambient noise...")
             recognizer.adjust_for_ambient_noise(source, duration=2)
             print(" Microphone setup complete")
@@ -174,40 +184,25 @@ def setup_microphone():
         return False
 
 def spitch_speech_to_text(audio_data, language):
-    """Use Spitch API for speech-to-text transcription"""
+    """
+    Use Spitch API for speech-to-text transcription
+
+    ``audio_data`` is an ``sr.AudioData`` or WAV bytes/memoryview; it is sent
+    straight from memory, so concurrent calls never share a file.
+    """
     try:
         spitch_api_key = os.getenv("SPITCH_API_KEY")
         if not spitch_api_key:
             raise Exception("Spitch API key not found")
         
-        # Initialize Spitch client
-        client = Client(api_key=spitch_api_key)
-        
-        # Save audio data to a temporary WAV file
-        temp_audio_file = "temp_audio.wav"
-        with open(temp_audio_file, "wb") as f:
-            f.write(audio_data.get_wav_data())
+        # Shared Spitch client (reuses warm connections between utterances)
+        from spitch_client import spitch_transcribe
         
-        try:
-            # Read the audio file and send to Spitch
-            with open(temp_audio_file, 'rb') as audio_file:
-                response = client.speech.transcribe(
-                    language=language,
-                    content=audio_file.read()
-                )
-            
-            # Clean up temporary file
-            if os.path.exists(temp_audio_file):
-                os.remove(temp_audio_file)
-            
-            print(f'Text: {response.text}')
-            return response.text
-            
-        except Exception as e:
-            # Clean up temporary file in case of error
-            if os.path.exists(temp_audio_file):
-                os.remove(temp_audio_file)
-            raise e
+        # 16 kHz mono, compressed per SPITCH_STT_UPLOAD_FORMAT
+        encoded = encode_for_stt(audio_data, "spitch")
+        text = spitch_transcribe(encoded.upload(), language, api_key=spitch_api_key)
+        print(f'Text: {text}')
+        return text
             
     except Exception as e:
         logger.error(f"Spitch STT failed: {e}")
@@ -216,7 +211,7 @@ def spitch_speech_to_text(audio_data, language):
 def capture_speech(source_lang, timeout=10, phrase_time_limit=5):
     """Capture and recognize speech using appropriate STT service"""
     try:
-        with mic as source:
+        with get_microphone() as source:
             print(" Listening... Speak now!")
             
             # Listen for audio
@@ -225,7 +220,24 @@ def capture_speech(source_lang, timeout=10, phrase_time_limit=5):
                 timeout=timeout, 
                 phrase_time_limit=phrase_time_limit
             )
+
+        # Trim silence before STT; a capture with no speech never reaches the network
+        audio = trim_silence(audio)
+        if audio is None:
+            raise Exception("No speech detected in the captured audio")
             
+        return recognize_audio(audio, source_lang)
+        
+    except sr.WaitTimeoutError:
+        raise Exception("No speech detected within timeout period")
+    except Exception as e:
+        if "Could not understand" in str(e) or "please speak more clearly" in str(e):
+            raise e
+        raise Exception(f"Speech capture failed: {e}")
+
+def recognize_audio(audio, source_lang):
+    """Recognize captured audio using the appropriate STT service"""
+    try:
         print(" Converting speech to text...")
         
         # Check if this is an African language and Spitch is available
@@ -259,14 +271,10 @@ def capture_speech(source_lang, timeout=10, phrase_time_limit=5):
             else:
                 raise Exception("Could not understand the audio - please speak more clearly")
         
-    except sr.WaitTimeoutError:
-        raise Exception("No speech detected within timeout period")
+    except sr.UnknownValueError:
+        raise Exception("Could not understand the audio - please speak more clearly")
     except sr.RequestError as e:
         raise Exception(f"Speech recognition service error: {e}")
-    except Exception as e:
-        if "Could not understand" in str(e) or "please speak more clearly" in str(e):
-            raise e
-        raise Exception(f"Speech capture failed: {e}")
 
 def translate_speech(text, source_lang, target_lang, source_type, target_type):
     """Translate recognized speech text"""
@@ -275,8 +283,14 @@ def translate_speech(text, source_lang, target_lang, source_type, target_type):
         
         # Determine translation method based on language types
         if source_type.lower() == "others" and target_type.lower() == "others":
-            # Both are non-African languages - use MBART
-            translation = translate_text_with_mbart(text, source_lang, target_lang)
+            # Both are non-African languages - use MBART, showing words as they decode
+            print(" Translating: ", end="", flush=True)
+            pieces = []
+            for piece in stream_translate_with_mbart(text, source_lang, target_lang):
+                pieces.append(piece)
+                print(piece, end="", flush=True)
+            print()
+            translation = "".join(pieces).strip()
             logger.info(f"MBART translation: '{translation}'")
             
         else:
@@ -284,13 +298,10 @@ def translate_speech(text, source_lang, target_lang, source_type, target_type):
             spitch_available = bool(os.getenv('SPITCH_API_KEY'))
             
             if spitch_available:
-                try:
-                    translation = translate_text_with_spitch(text, source_lang, target_lang)
-                    logger.info(f"Spitch translation: '{translation}'")
-                except Exception as e:
-                    logger.warning(f"Spitch translation failed: {e}")
-                    logger.info("Falling back to fallback translator")
-                    translation = translate_text_fallback(text, source_lang, target_lang)
+                # Spitch, hedged with the fallback translator when it runs slow or fails
+                result = hedged_translate(text, source_lang, target_lang)
+                translation = result.text
+                logger.info(f"{result.backend} translation in {result.latency:.2f}s: '{translation}'")
             else:
                 logger.info("Spitch API not available, using fallback")
                 translation = translate_text_fallback(text, source_lang, target_lang)
@@ -307,6 +318,53 @@ def translate_speech(text, source_lang, target_lang, source_type, target_type):
         except Exception as fe:
             raise Exception(f"All translation methods failed: {e}")
 
+def run_continuous_session(source_lang, target_lang, source_type, target_type):
+    """Translate utterances as they are segmented from a continuous capture"""
+    print("\n Listening continuously... Pause between sentences, press Ctrl+C to stop")
+    
+    capture = ContinuousCapture(get_microphone())
+    try:
+        with capture:
+            while True:
+                utterance = capture.get(timeout=1.0)
+                if utterance is None:
+                    continue
+                
+                try:
+                    print(f"\n--- Utterance {utterance.index} ({utterance.duration:.1f}s, {capture.pending()} waiting) ---")
+                    recognized_text = recognize_audio(utterance.audio, source_lang)
+                    print(f" Recognized: '{recognized_text}'")
+                    
+                    translated_text = translate_speech(
+                        recognized_text, source_lang, target_lang,
+                        source_type, target_type
+                    )
+                    
+                    print("=" * 70)
+                    print(f" ORIGINAL  : {recognized_text}")
+                    print(f" TRANSLATED: {translated_text}")
+                    print("=" * 70)
+                    
+                    # Recording continues during playback, but the speaker output is not segmented
+                    print(" Converting to speech...")
+                    with capture.muted():
+                        speech_success = speak_text(
+                            translated_text, source_lang, target_lang,
+                            source_type, target_type
+                        )
+                    if not speech_success:
+                        print(" Speech output failed, but translation was successful")
+                        
+                except Exception as e:
+                    print(f" Error in utterance {utterance.index}: {e}")
+                    logger.error(f"Continuous translation of utterance {utterance.index} failed: {e}")
+                    
+    except KeyboardInterrupt:
+        print("\n\n Session interrupted by user")
+    
+    stats = capture.stats()
+    print(f" Captured {stats['captured_seconds']}s of audio, {stats['utterances']} utterance(s)")
+
 def main():
     """Main speech-to-speech translation function"""
     print(" Speech-to-Speech Translator with Spitch STT")
@@ -348,6 +406,11 @@ def main():
             print(" Invalid target language selection")
             return
         
+        # Only Others -> Others sessions use MBART; load it in the background
+        # while the session starts, warming up the chosen pair
+        if MBART_WARMUP_ON_STARTUP and source_type.lower() == "others" and target_type.lower() == "others":
+            start_mbart_warmup([(source_lang, target_lang)])
+        
         # Display configuration summary
         print(f"\n CONFIGURATION SUMMARY")
         print("-" * 50)
@@ -362,6 +425,12 @@ def main():
         else:
             print(f"   STT Method: Google (Fallback)")
         
+        # Capture mode: one utterance per prompt, or hands-free continuous capture
+        capture_mode = get_user_choice(
+            "Choose capture mode (Single/Continuous)",
+            ["Single", "Continuous"]
+        )
+        
         # Main translation loop
         print(f"\n Starting speech-to-speech translation session...")
         print(" Tips:")
@@ -369,6 +438,12 @@ def main():
         print("   - Pause between sentences")
         print("   - Press Ctrl+C to exit anytime")
         
+        if capture_mode.lower() == "continuous":
+            run_continuous_session(source_lang, target_lang, source_type, target_type)
+            print(f"\n Speech-to-speech translation session completed")
+            print("Thank you for using the Speech-to-Speech Translator! 👋")
+            return
+        
         MAX_ATTEMPTS = 5
         attempt = 0
         
@@ -0,0 +1,301 @@
+"""
+Process-wide Spitch SDK client registry
+
+Every Spitch STT/TTS/translation path gets its client from here instead of
+constructing ``spitch.Client`` per call; async callers get a
+``spitch.AsyncClient`` per event loop. Clients are created lazily, once per
+API key, with a sized keep-alive connection pool, so back-to-back utterances
+reuse warm connections. Call outcomes are tracked per client for health
+reporting, and all clients are closed at interpreter exit.
+"""
+import os
+import time
+import atexit
+import logging
+import weakref
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Client configuration (can be overridden from the environment)
+SPITCH_CLIENT_MAX_CONNECTIONS = int(os.getenv("SPITCH_CLIENT_MAX_CONNECTIONS", "10"))
+SPITCH_CLIENT_MAX_KEEPALIVE = int(os.getenv("SPITCH_CLIENT_MAX_KEEPALIVE", "5"))
+SPITCH_CLIENT_KEEPALIVE_EXPIRY = float(os.getenv("SPITCH_CLIENT_KEEPALIVE_EXPIRY", "60"))
+SPITCH_CLIENT_TIMEOUT = float(os.getenv("SPITCH_CLIENT_TIMEOUT", "60"))
+SPITCH_CLIENT_MAX_RETRIES = int(os.getenv("SPITCH_CLIENT_MAX_RETRIES", "2"))
+SPITCH_SDK_BASE_URL = os.getenv("SPITCH_SDK_BASE_URL") or None  # None: the SDK's default endpoint
+
+# Registry: API key -> client / health counters
+_clients = {}
+_health = {}
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> {API key: AsyncClient}
+_clients_lock = threading.Lock()
+
+# Circuit breaker backend per SDK operation
+_BREAKER_BACKENDS = {'transcribe': 'stt', 'generate': 'tts', 'translate': 'translate'}
+
+
+def _resolve_api_key(api_key):
+    api_key = api_key or os.getenv("SPITCH_API_KEY")
+    if not api_key:
+        raise Exception("Spitch API key not found")
+    return api_key
+
+
+def _new_health():
+    return {
+        'created_at': time.time(),
+        'calls': 0,
+        'failures': 0,
+        'consecutive_failures': 0,
+        'last_error': None,
+        'last_latency': None,
+        'last_success_at': None
+    }
+
+
+def get_spitch_client(api_key=None):
+    """
+    Return the shared Spitch client for ``api_key`` (default: SPITCH_API_KEY)
+
+    The client and its connection pool are created on first use; a client
+    that has been closed is replaced transparently.
+    """
+    api_key = _resolve_api_key(api_key)
+    client = _clients.get(api_key)
+    if client is not None and not client.is_closed():
+        return client
+
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None or client.is_closed():
+            from spitch import Client, DefaultHttpxClient
+
+            client = Client(
+                api_key=api_key,
+                base_url=SPITCH_SDK_BASE_URL,
+                max_retries=SPITCH_CLIENT_MAX_RETRIES,
+                http_client=DefaultHttpxClient(timeout=SPITCH_CLIENT_TIMEOUT, limits=_http_limits())
+            )
+            _clients[api_key] = client
+            _health[api_key] = _new_health()
+            logger.info(f"Created shared Spitch client (pool of {SPITCH_CLIENT_MAX_CONNECTIONS} connections)")
+    return client
+
+
+def _http_limits():
+    import httpx
+
+    return httpx.Limits(
+        max_connections=SPITCH_CLIENT_MAX_CONNECTIONS,
+        max_keepalive_connections=SPITCH_CLIENT_MAX_KEEPALIVE,
+        keepalive_expiry=SPITCH_CLIENT_KEEPALIVE_EXPIRY
+    )
+
+
+def get_async_spitch_client(api_key=None):
+    """
+    Return the shared ``spitch.AsyncClient`` for ``api_key`` on the running loop
+
+    Async connection pools belong to one event loop, so there is one client
+    per (loop, API key); call ``aclose_spitch_clients`` before the loop ends.
+    """
+    import asyncio
+
+    api_key = _resolve_api_key(api_key)
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(api_key)
+        if client is None or client.is_closed():
+            from spitch import AsyncClient, DefaultAsyncHttpxClient
+
+            client = AsyncClient(
+                api_key=api_key,
+                base_url=SPITCH_SDK_BASE_URL,
+                max_retries=SPITCH_CLIENT_MAX_RETRIES,
+                http_client=DefaultAsyncHttpxClient(timeout=SPITCH_CLIENT_TIMEOUT, limits=_http_limits())
+            )
+            clients[api_key] = client
+            _health.setdefault(api_key, _new_health())
+    return client
+
+
+def _record_outcome(api_key, operation, start, error=None):
+    with _clients_lock:
+        health = _health.setdefault(api_key, _new_health())
+        health['calls'] += 1
+        if error is not None:
+            health['failures'] += 1
+            health['consecutive_failures'] += 1
+            health['last_error'] = f"{operation}: {error}"
+        else:
+            health['consecutive_failures'] = 0
+            health['last_latency'] = time.perf_counter() - start
+            health['last_success_at'] = time.time()
+
+
+def _breaker(operation):
+    """Circuit breaker guarding a Spitch operation (fails fast during outages)"""
+    from Speech_translator import spitch_circuit_breaker
+    return spitch_circuit_breaker(_BREAKER_BACKENDS[operation])
+
+
+def _call_spitch(api_key, operation, call):
+    """Run ``call(client)`` on the shared client and record the outcome"""
+    api_key = _resolve_api_key(api_key)
+    client = get_spitch_client(api_key)
+    start = time.perf_counter()
+    try:
+        result = _breaker(operation).call(call, client)
+    except Exception as e:
+        _record_outcome(api_key, operation, start, e)
+        raise
+    _record_outcome(api_key, operation, start)
+    return result
+
+
+async def _call_spitch_async(api_key, operation, call):
+    """Await ``call(async_client)`` on the loop's shared client and record the outcome"""
+    api_key = _resolve_api_key(api_key)
+    client = get_async_spitch_client(api_key)
+    start = time.perf_counter()
+    try:
+        result = await _breaker(operation).call_async(call, client)
+    except Exception as e:
+        _record_outcome(api_key, operation, start, e)
+        raise
+    _record_outcome(api_key, operation, start)
+    return result
+
+
+def as_audio_bytes(content):
+    """
+    Return uploadable bytes for captured audio without touching disk
+
+    Accepts ``bytes`` (returned as is), ``bytearray``/``memoryview`` (a
+    memoryview spanning a whole ``bytes`` object is unwrapped without a copy)
+    or a ``speech_recognition.AudioData`` (encoded to WAV in memory).
+    """
+    if isinstance(content, bytes):
+        return content
+    if hasattr(content, "get_wav_data"):
+        return content.get_wav_data()
+    view = memoryview(content)
+    if isinstance(view.obj, bytes) and view.contiguous and view.nbytes == len(view.obj):
+        return view.obj
+    return view.tobytes()
+
+
+def spitch_transcribe(content, language, api_key=None):
+    """
+    Transcribe audio with the shared Spitch client
+
+    Args:
+        content (bytes, bytearray, memoryview or AudioData): Encoded audio
+            (e.g., WAV bytes), handed to the SDK straight from memory; or a
+            (filename, bytes, mime type) tuple such as EncodedAudio.upload()
+        language (str): Spitch language code
+
+    Returns:
+        str: Transcribed text
+    """
+    if not isinstance(content, tuple):
+        content = as_audio_bytes(content)
+    response = _call_spitch(
+        api_key, "transcribe",
+        lambda client: client.speech.transcribe(language=language, content=content)
+    )
+    return response.text
+
+
+def spitch_generate_speech(text, language, voice='sade', api_key=None):
+    """
+    Synthesize speech with the shared Spitch client
+
+    Returns:
+        bytes: Encoded audio returned by Spitch
+    """
+    return _call_spitch(
+        api_key, "generate",
+        lambda client: client.speech.generate(text=text, language=language, voice=voice).read()
+    )
+
+
+def spitch_translate(text, source_lang, target_lang, api_key=None):
+    """Translate text with the shared Spitch client (SDK translation path)"""
+    response = _call_spitch(
+        api_key, "translate",
+        lambda client: client.translate(text=text, source_language=source_lang, target_language=target_lang)
+    )
+    return response.translated_text
+
+
+async def spitch_transcribe_async(content, language, api_key=None):
+    """Async ``spitch_transcribe`` on the running loop's shared client"""
+    if not isinstance(content, tuple):
+        content = as_audio_bytes(content)
+
+    async def call(client):
+        return await client.speech.transcribe(language=language, content=content)
+
+    response = await _call_spitch_async(api_key, "transcribe", call)
+    return response.text
+
+
+async def spitch_generate_speech_async(text, language, voice='sade', api_key=None):
+    """Async ``spitch_generate_speech`` on the running loop's shared client"""
+    async def call(client):
+        response = await client.speech.generate(text=text, language=language, voice=voice)
+        return await response.read()
+
+    return await _call_spitch_async(api_key, "generate", call)
+
+
+def spitch_client_health():
+    """
+    Return health counters for every registered client
+
+    Keys are masked API keys; values hold call/failure counts, consecutive
+    failures, the last error and latency, and whether the client is healthy
+    (open and without consecutive failures).
+    """
+    with _clients_lock:
+        report = {}
+        for api_key, health in _health.items():
+            client = _clients.get(api_key)
+            is_open = client is not None and not client.is_closed()
+            report[f"...{api_key[-4:]}"] = dict(
+                health,
+                open=is_open,
+                healthy=is_open and health['consecutive_failures'] == 0
+            )
+        return report
+
+
+def close_spitch_clients():
+    """Close every shared client and its connection pool"""
+    with _clients_lock:
+        for client in _clients.values():
+            try:
+                client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Spitch client: {e}")
+        _clients.clear()
+        _health.clear()
+
+
+async def aclose_spitch_clients():
+    """Close the running loop's async clients"""
+    import asyncio
+
+    with _clients_lock:
+        clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        try:
+            await client.close()
+        except Exception as e:
+            logger.warning(f"Failed to close async Spitch client: {e}")
+
+
+atexit.register(close_spitch_clients)
@@ -1,16 +1,17 @@
 import streamlit as st
 import speech_recognition as sr
-import tempfile
 import os
 import io
 import base64
-from gtts import gTTS
-import pygame
 import threading
 import time
-from Speech_translator import translate_text_with_mbart, translate_text_with_spitch, translate_text_fallback
+from Speech_translator import stream_translate_with_mbart, translate_text_fallback, start_mbart_warmup, is_mbart_ready, MBART_WARMUP_ON_STARTUP
+from hedging import hedged_translate
+from audio_vad import trim_silence
+from audio_encoding import encode_for_stt
 from dotenv import load_dotenv
 import logging
+import importlib.util
 
 try:
     import speech_recognition as sr
@@ -19,12 +20,9 @@ except ImportError:
     SPEECH_RECOGNITION_AVAILABLE = False
     st.error("speech_recognition module not found. Please install it using: pip install SpeechRecognition")
 
-# Add Spitch imports for both STT and TTS
-try:
-    from spitch import Client
-    SPITCH_AVAILABLE = True
-except ImportError:
-    SPITCH_AVAILABLE = False
+# Check for the Spitch SDK (STT and TTS) without importing it at startup
+SPITCH_AVAILABLE = importlib.util.find_spec("spitch") is not None
+if not SPITCH_AVAILABLE:
     logging.warning("Spitch SDK not available")
 
 # Load environment variables
@@ -34,14 +32,6 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize pygame mixer for audio playback
-try:
-    pygame.mixer.init()
-    PYGAME_AVAILABLE = True
-except:
-    PYGAME_AVAILABLE = False
-    logger.warning("Pygame not available")
-
 # Language configurations
 AFRICAN_LANGUAGES = {
     "yo": "Yoruba",
@@ -113,7 +103,7 @@ SR_LANGUAGE_MAP = {
 }
 
 def spitch_speech_to_text(audio_data, language):
-    """Use Spitch API for speech-to-text transcription"""
+    """Use Spitch API for speech-to-text transcription (sr.AudioData or WAV bytes/memoryview, sent from memory)"""
     try:
         spitch_api_key = os.getenv("SPITCH_API_KEY")
         if not spitch_api_key:
@@ -122,33 +112,14 @@ def spitch_speech_to_text(audio_data, language):
         if not SPITCH_AVAILABLE:
             raise Exception("Spitch SDK not available")
         
-        # Initialize Spitch client
-        client = Client(api_key=spitch_api_key)
-        
-        # Create temporary file for audio data
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            temp_file.write(audio_data)
-            temp_file_path = temp_file.name
+        # Shared Spitch client (reuses warm connections between utterances)
+        from spitch_client import spitch_transcribe
         
-        try:
-            # Read the audio file and send to Spitch
-            with open(temp_file_path, 'rb') as audio_file:
-                response = client.speech.transcribe(
-                    language=language,
-                    content=audio_file.read()
-                )
-            
-            # Clean up temporary file
-            os.unlink(temp_file_path)
-            
-            logger.info(f'Spitch STT result: {response.text}')
-            return response.text
-            
-        except Exception as e:
-            # Clean up temporary file in case of error
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
-            raise e
+        # 16 kHz mono, compressed per SPITCH_STT_UPLOAD_FORMAT
+        encoded = encode_for_stt(audio_data, "spitch")
+        text = spitch_transcribe(encoded.upload(), language, api_key=spitch_api_key)
+        logger.info(f'Spitch STT result: {text}')
+        return text
             
     except Exception as e:
         logger.error(f"Spitch STT failed: {e}")
@@ -159,11 +130,8 @@ def process_audio_file(audio_file, source_lang):
     try:
         recognizer = sr.Recognizer()
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp_file:
-            audio_data = audio_file.read()
-            tmp_file.write(audio_data)
-            tmp_file_path = tmp_file.name
+        # Keep the upload in memory; both STT paths read from this buffer
+        audio_data = audio_file.read()
         
         # Check if this is an African language and Spitch is available
         spitch_available = bool(os.getenv('SPITCH_API_KEY')) and SPITCH_AVAILABLE
@@ -174,9 +142,6 @@ def process_audio_file(audio_file, source_lang):
                 spitch_lang = SPITCH_STT_LANGUAGES[source_lang]
                 text = spitch_speech_to_text(audio_data, spitch_lang)
                 logger.info(f"Spitch STT successful for {source_lang}: '{text}'")
-                
-                # Clean up temporary file
-                os.unlink(tmp_file_path)
                 return text.strip()
                 
             except Exception as e:
@@ -185,7 +150,7 @@ def process_audio_file(audio_file, source_lang):
                 # Fall through to Google STT
         
         # Use Google STT for non-African languages or as fallback
-        with sr.AudioFile(tmp_file_path) as source:
+        with sr.AudioFile(io.BytesIO(audio_data)) as source:
             recognizer.adjust_for_ambient_noise(source)
             audio = recognizer.listen(source)
         
@@ -204,17 +169,9 @@ def process_audio_file(audio_file, source_lang):
             else:
                 raise Exception("Could not understand the audio - please speak more clearly")
         
-        # Clean up temporary file
-        os.unlink(tmp_file_path)
-        
         return text.strip()
         
     except Exception as e:
-        if 'tmp_file_path' in locals():
-            try:
-                os.unlink(tmp_file_path)
-            except:
-                pass
         raise Exception(f"Speech recognition failed: {str(e)}")
 
 def record_audio_from_mic(source_lang, duration=5):
@@ -228,6 +185,11 @@ def record_audio_from_mic(source_lang, duration=5):
         
         with microphone as source:
             audio = recognizer.listen(source, timeout=duration, phrase_time_limit=duration)
+
+        # Trim silence before STT; a capture with no speech never reaches the network
+        audio = trim_silence(audio)
+        if audio is None:
+            raise Exception("No speech detected in the captured audio")
         
         # Check if this is an African language and Spitch is available
         spitch_available = bool(os.getenv('SPITCH_API_KEY')) and SPITCH_AVAILABLE
@@ -236,8 +198,8 @@ def record_audio_from_mic(source_lang, duration=5):
             try:
                 # Use Spitch for African languages
                 spitch_lang = SPITCH_STT_LANGUAGES[source_lang]
-                audio_data = audio.get_wav_data()
-                text = spitch_speech_to_text(audio_data, spitch_lang)
+                # Hand over the AudioData itself: encode_for_stt resamples it directly
+                text = spitch_speech_to_text(audio, spitch_lang)
                 logger.info(f"Spitch STT successful for {source_lang}: '{text}'")
                 return text.strip()
                 
@@ -270,14 +232,21 @@ def record_audio_from_mic(source_lang, duration=5):
     except Exception as e:
         raise Exception(f"Recording failed: {str(e)}")
 
-def translate_text(text, source_lang, target_lang, source_type, target_type):
-    """Translate text using appropriate method"""
+def translate_text(text, source_lang, target_lang, source_type, target_type, placeholder=None):
+    """Translate text using appropriate method (MBART output streams into ``placeholder``)"""
     try:
         logger.info(f"Translating: '{text}' from {source_lang} ({source_type}) to {target_lang} ({target_type})")
         
         if source_type.lower() == "others" and target_type.lower() == "others":
-            # Use MBART for non-African languages
-            translation = translate_text_with_mbart(text, source_lang, target_lang)
+            # Use MBART for non-African languages, showing words as they decode
+            translation = ""
+            for piece in stream_translate_with_mbart(text, source_lang, target_lang):
+                translation += piece
+                if placeholder is not None:
+                    placeholder.markdown(f"**Translating:** {translation}▌")
+            if placeholder is not None:
+                placeholder.empty()
+            translation = translation.strip()
             logger.info(f"MBART translation: '{translation}'")
             return translation
         else:
@@ -285,16 +254,12 @@ def translate_text(text, source_lang, target_lang, source_type, target_type):
             spitch_available = bool(os.getenv('SPITCH_API_KEY')) and SPITCH_AVAILABLE
             
             if spitch_available:
-                try:
-                    translation = translate_text_with_spitch(text, source_lang, target_lang)
-                    logger.info(f"Spitch translation: '{translation}'")
-                    return translation
-                except Exception as e:
-                    logger.warning(f"Spitch translation failed: {e}")
-                    st.warning(f"Spitch translation failed, using fallback: {str(e)}")
-                    translation = translate_text_fallback(text, source_lang, target_lang)
-                    logger.info(f"Fallback translation: '{translation}'")
-                    return translation
+                # Spitch, hedged with the fallback translator when it runs slow or fails
+                result = hedged_translate(text, source_lang, target_lang)
+                logger.info(f"{result.backend} translation in {result.latency:.2f}s: '{result.text}'")
+                if result.backend != "spitch":
+                    st.warning("Spitch was too slow or failed, using fallback translation")
+                return result.text
             else:
                 translation = translate_text_fallback(text, source_lang, target_lang)
                 logger.info(f"Fallback translation: '{translation}'")
@@ -320,18 +285,12 @@ def spitch_tts_bytes(text, target_lang):
         if not spitch_api_key:
             raise Exception("Spitch API key not found")
 
-        client = Client(api_key=spitch_api_key)
+        from spitch_client import spitch_generate_speech
         spitch_lang = SPITCH_TTS_LANGUAGE_MAP.get(target_lang, target_lang)
 
         logger.info(f"Using Spitch TTS for {spitch_lang}: '{text}'")
 
-        response = client.speech.generate(
-            text=text,
-            language=spitch_lang,
-            voice='sade'
-        )
-
-        audio_bytes = response.read()
+        audio_bytes = spitch_generate_speech(text, spitch_lang, voice='sade', api_key=spitch_api_key)
         
         if not audio_bytes:
             raise Exception("No audio content received from Spitch")
@@ -346,6 +305,8 @@ def spitch_tts_bytes(text, target_lang):
 def google_tts_bytes(text, target_lang):
     """Convert text to speech using Google TTS and return audio bytes"""
     try:
+        from gtts import gTTS
+
         gtts_lang = GTTS_LANGUAGE_MAP.get(target_lang, target_lang.split('_')[0] if '_' in target_lang else target_lang)
         
         logger.info(f"Using Google TTS for {gtts_lang}: '{text}'")
@@ -418,7 +379,7 @@ def main():
         st.write(f"🔹 Spitch STT: {'✅ Available' if spitch_available else '❌ Not Available'}")
         st.write(f"🔹 Spitch Translation: {'✅ Available' if spitch_available else '❌ Not Available'}")
         st.write(f"🔹 Spitch TTS: {'✅ Available' if spitch_available else '❌ Not Available'}")
-        st.write("🔹 MBART Model: ✅ Available")
+        st.write(f"🔹 MBART Model: {'✅ Available' if is_mbart_ready() else '⏳ Not loaded yet'}")
         st.write("🔹 Google STT: ✅ Available")
         st.write("🔹 Google TTS: ✅ Available")
         
@@ -488,6 +449,11 @@ def main():
                 key="target_lang"
             )
             st.info("🌐 Will use Google TTS")
+        
+        # Only Others -> Others uses MBART; load it in the background once per
+        # process (returns at once on reruns)
+        if MBART_WARMUP_ON_STARTUP and source_type == "Others" and target_type == "Others":
+            start_mbart_warmup([(source_lang, target_lang)])
     
     # Main content area
     col1, col2 = st.columns([1, 1])
@@ -564,8 +530,10 @@ def main():
             with st.spinner("Translating..."):
                 try:
                     # Translate text
+                    partial_output = st.empty()
                     translated_text = translate_text(
-                        recognized_text, source_lang, target_lang, source_type, target_type
+                        recognized_text, source_lang, target_lang, source_type, target_type,
+                        placeholder=partial_output
                     )
                     
                     # Display translation
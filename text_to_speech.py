@@ -1,6 +1,4 @@
-from gtts import gTTS
 import os
-import pygame
 import io
 from Speech_translator import translate_text_with_mbart, translate_text_with_spitch, translate_text_fallback
 from dotenv import load_dotenv
@@ -11,7 +9,6 @@ import platform
 import json
 import threading
 import base64
-from spitch import Client
 
 
 
@@ -22,13 +19,8 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize pygame mixer for audio playback
-try:
-    pygame.mixer.init()
-    PYGAME_AVAILABLE = True
-except:
-    PYGAME_AVAILABLE = False
-    logger.warning("Pygame not available, will use system audio playback")
+# Pygame mixer is initialized on first playback (None = not tried yet)
+PYGAME_AVAILABLE = None
 
 # Language mapping for gTTS (Google TTS supported languages)
 GTTS_LANGUAGE_MAP = {
@@ -48,11 +40,28 @@ SPITCH_LANGUAGE_MAP = {
     'en': 'en',  # English
 }
 
+# Target languages synthesized with Spitch TTS first (Google TTS otherwise)
+SPITCH_TTS_LANGUAGES = ['yo', 'ha', 'ig', 'sw', 'zu', 'xh', 'af', 'am']
+
+
+def init_pygame_mixer():
+    """Import pygame and initialize its mixer on first use"""
+    global PYGAME_AVAILABLE
+    if PYGAME_AVAILABLE is None:
+        try:
+            import pygame
+            pygame.mixer.init()
+            PYGAME_AVAILABLE = True
+        except Exception:
+            PYGAME_AVAILABLE = False
+            logger.warning("Pygame not available, will use system audio playback")
+    return PYGAME_AVAILABLE
 
 def play_audio_file(file_path):
     try:
-        if not PYGAME_AVAILABLE:
+        if not init_pygame_mixer():
             return False
+        import pygame
         pygame.mixer.music.load(file_path)
         pygame.mixer.music.play()
         while pygame.mixer.music.get_busy():
@@ -65,7 +74,7 @@ def play_audio_file(file_path):
 
 def cross_platform_play_audio(file_path):
     try:
-        if PYGAME_AVAILABLE and play_audio_file(file_path):
+        if play_audio_file(file_path):
             return True
         system = platform.system().lower()
         if system == "windows":
@@ -129,8 +138,7 @@ def text_to_speech(text, tgt_lang):
         if not text.strip():
             logger.warning("Empty text for TTS")
             return False
-        african_langs = ['yo', 'ha', 'ig', 'sw', 'zu', 'xh', 'af', 'am']
-        if tgt_lang in african_langs and os.getenv('SPITCH_API_KEY'):
+        if tgt_lang in SPITCH_TTS_LANGUAGES and os.getenv('SPITCH_API_KEY'):
             logger.info(f"Attempting Spitch TTS for {tgt_lang}")
             if spitch_tts(text, tgt_lang):
                 return True
@@ -147,19 +155,13 @@ def spitch_tts(text, tgt_lang):
             logger.warning("Spitch API key not found in environment variables")
             return False
 
-        client = Client(api_key=spitch_api_key)
+        from spitch_client import spitch_generate_speech
 
         spitch_lang = SPITCH_LANGUAGE_MAP.get(tgt_lang, tgt_lang)
 
         logger.info(f"Generating speech for language: {spitch_lang} and text: {text}")
 
-        response = client.speech.generate(
-            text=text,
-            language=spitch_lang,
-            voice='sade'
-        )
-  
-        audio_bytes = response.read()
+        audio_bytes = spitch_generate_speech(text, spitch_lang, voice='sade', api_key=spitch_api_key)
 
         if not audio_bytes:
             logger.error("No audio content received from Spitch")
@@ -181,24 +183,32 @@ def spitch_tts(text, tgt_lang):
         logger.error(f"Spitch TTS failed: {e}")
         return False
 
-def google_tts(text, tgt_lang):
+def google_tts_bytes(text, tgt_lang):
+    """Synthesize speech with Google TTS and return the MP3 bytes"""
+    from gtts import gTTS
+    gtts_lang = GTTS_LANGUAGE_MAP.get(tgt_lang, tgt_lang.split('_')[0] if '_' in tgt_lang else tgt_lang)
+    logger.info(f"Using Google TTS for {gtts_lang}: '{text}'")
     try:
-        gtts_lang = GTTS_LANGUAGE_MAP.get(tgt_lang, tgt_lang.split('_')[0] if '_' in tgt_lang else tgt_lang)
-        logger.info(f"Using Google TTS for {gtts_lang}: '{text}'")
-        try:
-            tts = gTTS(text=text, lang=gtts_lang, slow=False)
-        except Exception as e:
-            if "Language not supported" in str(e):
-                logger.error(f"Google TTS failed: Language not supported: {gtts_lang}")
-                if gtts_lang != 'en':
-                    logger.info("Falling back to English for TTS")
-                    tts = gTTS(text=text, lang='en', slow=False)
-                else:
-                    raise
+        tts = gTTS(text=text, lang=gtts_lang, slow=False)
+    except Exception as e:
+        if "Language not supported" in str(e):
+            logger.error(f"Google TTS failed: Language not supported: {gtts_lang}")
+            if gtts_lang != 'en':
+                logger.info("Falling back to English for TTS")
+                tts = gTTS(text=text, lang='en', slow=False)
             else:
                 raise
+        else:
+            raise
+    audio_buffer = io.BytesIO()
+    tts.write_to_fp(audio_buffer)
+    return audio_buffer.getvalue()
+
+def google_tts(text, tgt_lang):
+    try:
+        audio_bytes = google_tts_bytes(text, tgt_lang)
         with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-            tts.save(temp_file.name)
+            temp_file.write(audio_bytes)
             temp_file_path = temp_file.name
         logger.info(f"Google TTS audio saved to: {temp_file_path}")
         success = cross_platform_play_audio(temp_file_path)
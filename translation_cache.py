@@ -0,0 +1,337 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration (can be overridden from the environment)
+TRANSLATION_CACHE_ENABLED = os.getenv("TRANSLATION_CACHE_ENABLED", "1") == "1"
+TRANSLATION_CACHE_MEMORY_SIZE = int(os.getenv("TRANSLATION_CACHE_MEMORY_SIZE", "2048"))
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", "translation_cache.sqlite3")
+TRANSLATION_CACHE_TTL = float(os.getenv("TRANSLATION_CACHE_TTL", str(30 * 24 * 3600)))
+TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "100000"))
+# Seconds to wait for another process's lock before skipping the disk tier
+TRANSLATION_CACHE_DB_TIMEOUT = float(os.getenv("TRANSLATION_CACHE_DB_TIMEOUT", "0.25"))
+
+# Global cache instance shared by all translation backends
+_translation_cache = None
+_translation_cache_lock = threading.Lock()
+
+
+def normalize_text(text):
+    """Normalize text for cache lookups (unicode form and whitespace)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def make_cache_key(text, source_lang, target_lang, backend, params=None):
+    """Build a stable cache key from the normalized text and request settings"""
+    key_data = json.dumps(
+        [normalize_text(text), source_lang, target_lang, backend, params or {}],
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """
+    Two-tier translation cache
+
+    The first tier is a bounded in-memory LRU. The second tier is a SQLite
+    file that survives restarts, with TTL expiry and size-based eviction of
+    the least recently used rows. The disk tier is best effort: when another
+    process holds the file, lookups and stores fall back to memory only.
+
+    ``_lock`` only guards the in-memory state, so memory hits never wait on
+    disk I/O. Each thread reads through its own SQLite connection, and
+    writes (which commit) are serialized by ``_write_lock``.
+    """
+
+    def __init__(self, memory_size=TRANSLATION_CACHE_MEMORY_SIZE, db_path=TRANSLATION_CACHE_PATH,
+                 ttl=TRANSLATION_CACHE_TTL, max_entries=TRANSLATION_CACHE_MAX_ENTRIES):
+        self.memory_size = memory_size
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._connections = []
+        self._disk_enabled = False
+        self._writes_since_evict = 0
+        self._pending_access = {}  # key -> last read time, written with the next store
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if db_path:
+            try:
+                self._disk_enabled = True
+                db = self._connection()
+                # WAL lets readers in other processes (worker pool, a second CLI) run alongside a writer
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "created REAL NOT NULL, accessed REAL NOT NULL)"
+                )
+                db.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON translations (accessed)")
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Translation cache disk tier disabled: {e}")
+                self._close_connections()
+
+    def get(self, key):
+        """Return the cached translation for ``key`` or None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            if not self._disk_enabled:
+                self.misses += 1
+                return None
+
+        now = time.time()
+        row = None
+        try:
+            db = self._connection()
+            if db is not None:
+                row = db.execute("SELECT value, created FROM translations WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Translation cache disk lookup failed, using memory only: {e}")
+
+        with self._lock:
+            if row is not None:
+                value, created = row
+                if now - created <= self.ttl:
+                    # No commit per read: the access time is written with the next store
+                    self._pending_access[key] = now
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+                # Expired rows are removed by the next eviction pass
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        """Store a translation in both tiers"""
+        with self._lock:
+            self._remember(key, value)
+            if not self._disk_enabled:
+                return
+            self._pending_access.pop(key, None)
+            pending_access = self._take_pending_access()
+
+        now = time.time()
+        with self._write_lock:
+            try:
+                db = self._connection()
+                if db is None:
+                    return
+                db.execute(
+                    "INSERT OR REPLACE INTO translations (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now)
+                )
+                self._write_access_times(db, pending_access)
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Translation cache disk store failed, kept in memory only: {e}")
+                self._rollback()
+                self._restore_pending_access(pending_access)
+                return
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= 100:
+                self._evict(db)
+
+    def get_or_compute(self, text, source_lang, target_lang, backend, compute, params=None):
+        """
+        Return a cached translation or compute and store it
+
+        Args:
+            text (str): Text to translate
+            source_lang (str): Source language code
+            target_lang (str): Target language code
+            backend (str): Translation backend name (e.g. 'mbart', 'spitch')
+            compute (callable): Called with no arguments on a miss
+            params (dict): Decoding parameters that affect the output
+
+        Returns:
+            str: Translated text
+        """
+        key = make_cache_key(text, source_lang, target_lang, backend, params)
+        cached = self.get(key)
+        if cached is not None:
+            logger.info(f"Translation cache hit ({backend}): '{text}'")
+            return cached
+
+        result = compute()
+        if result:
+            self.set(key, result)
+        return result
+
+    def stats(self):
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            stats = {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_entries': 0
+            }
+            disk_enabled = self._disk_enabled
+
+        if disk_enabled:
+            try:
+                db = self._connection()
+                if db is not None:
+                    stats['disk_entries'] = db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            except sqlite3.Error as e:
+                logger.warning(f"Translation cache disk stats unavailable: {e}")
+        return stats
+
+    def clear(self):
+        """Remove every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            self._pending_access.clear()
+            disk_enabled = self._disk_enabled
+        if disk_enabled:
+            with self._write_lock:
+                db = self._connection()
+                if db is not None:
+                    db.execute("DELETE FROM translations")
+                    db.commit()
+
+    def close(self):
+        with self._lock:
+            if not self._disk_enabled:
+                return
+            pending_access = self._take_pending_access()
+        with self._write_lock:
+            try:
+                db = self._connection()
+                self._write_access_times(db, pending_access)
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Translation cache access times not saved: {e}")
+            self._close_connections()
+
+    def _connection(self):
+        """This thread's SQLite connection (opened on first use), or None once closed"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            with self._lock:
+                if not self._disk_enabled:
+                    return None
+                db = sqlite3.connect(self.db_path, timeout=TRANSLATION_CACHE_DB_TIMEOUT, check_same_thread=False)
+                self._connections.append(db)
+            self._local.db = db
+        elif not self._disk_enabled:
+            return None
+        return db
+
+    def _close_connections(self):
+        with self._lock:
+            self._disk_enabled = False
+            connections, self._connections = self._connections, []
+        for db in connections:
+            try:
+                db.close()
+            except sqlite3.Error:
+                pass
+
+    def _remember(self, key, value):
+        # Caller holds self._lock
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _take_pending_access(self):
+        # Caller holds self._lock
+        pending_access, self._pending_access = self._pending_access, {}
+        return pending_access
+
+    def _restore_pending_access(self, pending_access):
+        with self._lock:
+            for key, accessed in pending_access.items():
+                self._pending_access.setdefault(key, accessed)
+
+    def _write_access_times(self, db, pending_access):
+        # Caller holds self._write_lock and commits
+        if pending_access:
+            db.executemany(
+                "UPDATE translations SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in pending_access.items()]
+            )
+
+    def _rollback(self):
+        try:
+            db = self._connection()
+            if db is not None:
+                db.rollback()
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, db):
+        """Drop expired rows, then the least recently used rows over the size limit"""
+        # Caller holds self._write_lock
+        self._writes_since_evict = 0
+        with self._lock:
+            pending_access = self._take_pending_access()
+        try:
+            self._write_access_times(db, pending_access)
+            db.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.ttl,))
+            count = db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            if count > self.max_entries:
+                db.execute(
+                    "DELETE FROM translations WHERE key IN "
+                    "(SELECT key FROM translations ORDER BY accessed ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Translation cache eviction failed: {e}")
+            self._rollback()
+            self._restore_pending_access(pending_access)
+
+
+def get_translation_cache():
+    """Return the process-wide translation cache"""
+    global _translation_cache
+
+    with _translation_cache_lock:
+        if _translation_cache is None:
+            _translation_cache = TranslationCache()
+    return _translation_cache
+
+
+def cached_translation(text, source_lang, target_lang, backend, compute, params=None):
+    """Look up a translation in the shared cache, computing it on a miss"""
+    if not TRANSLATION_CACHE_ENABLED:
+        return compute()
+    return get_translation_cache().get_or_compute(text, source_lang, target_lang, backend, compute, params)
+
+
+def lookup_translation(text, source_lang, target_lang, backend, params=None):
+    """Return a cached translation or None (used by batch paths)"""
+    if not TRANSLATION_CACHE_ENABLED:
+        return None
+    return get_translation_cache().get(make_cache_key(text, source_lang, target_lang, backend, params))
+
+
+def store_translation(text, source_lang, target_lang, backend, translation, params=None):
+    """Store a translation computed outside ``cached_translation``"""
+    if TRANSLATION_CACHE_ENABLED and translation:
+        get_translation_cache().set(make_cache_key(text, source_lang, target_lang, backend, params), translation)